@@ -0,0 +1,133 @@
+"""Lots de parties IA répartis sur plusieurs processus
+
+Chaque partie est jouée par headless.HeadlessGame avec sa propre graine. Les
+processus renvoient un enregistrement compact par partie, agrégé ensuite en
+moyennes, percentiles et débit.
+"""
+import os
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from headless import HeadlessGame
+from main import AI_BACKENDS, load_weights
+
+# Résultat d'une partie (duration = temps de jeu simulé en secondes)
+GameRecord = namedtuple('GameRecord', ['seed', 'score', 'lines', 'pieces', 'max_height', 'duration'])
+
+# Champs agrégés dans le résumé d'un lot
+SUMMARY_FIELDS = ['score', 'lines', 'pieces', 'max_height', 'duration']
+PERCENTILES = [10, 50, 90, 99]
+
+
+def play_game(seed, max_pieces=None, randomizer='uniform', depth=1, backend='python',
+              weights=None):
+    """Joue une partie et renvoie son enregistrement (exécuté dans un processus fils)"""
+    result = HeadlessGame(seed=seed, max_pieces=max_pieces, randomizer=randomizer,
+                          depth=depth, backend=backend, weights=weights).run()[0]
+    return GameRecord(
+        seed=seed,
+        score=result['score'],
+        lines=result['lines'],
+        pieces=result['pieces'],
+        max_height=result['max_height'],
+        duration=result['duration'],
+    )
+
+
+def _play_games(seeds, max_pieces, randomizer, depth, backend, weights):
+    """Joue plusieurs parties dans un même processus pour limiter les échanges"""
+    return [play_game(seed, max_pieces, randomizer, depth, backend, weights) for seed in seeds]
+
+
+def run_batch(num_games, seed=0, workers=None, max_pieces=None, randomizer='uniform',
+              depth=1, backend='python', chunk_size=8, weights=None):
+    """Joue num_games parties sur un pool de processus
+
+    La partie i utilise la graine seed + i, le lot est donc reproductible quel
+    que soit le nombre de processus. Renvoie les enregistrements triés par
+    graine et la durée réelle du lot en secondes.
+    """
+    seeds = list(range(seed, seed + num_games))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    start = time.perf_counter()
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        settings = [(max_pieces, randomizer, depth, backend, weights)] * len(chunks)
+        for chunk_records in executor.map(_play_games, chunks, *zip(*settings)):
+            records.extend(chunk_records)
+    elapsed = time.perf_counter() - start
+
+    return records, elapsed
+
+
+def percentile(values, q):
+    """Percentile q (0-100) par interpolation linéaire entre les rangs"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(records, elapsed):
+    """Agrège les enregistrements d'un lot : moyennes, percentiles et débit"""
+    summary = {'games': len(records), 'elapsed': elapsed}
+
+    for field in SUMMARY_FIELDS:
+        values = [getattr(record, field) for record in records]
+        stats = {'mean': sum(values) / len(values) if values else 0.0}
+        for q in PERCENTILES:
+            stats[f'p{q}'] = percentile(values, q)
+        summary[field] = stats
+
+    total_pieces = sum(record.pieces for record in records)
+    summary['games_per_second'] = len(records) / elapsed if elapsed else 0.0
+    summary['pieces_per_second'] = total_pieces / elapsed if elapsed else 0.0
+    return summary
+
+
+def format_summary(summary):
+    """Met en forme le résumé d'un lot pour l'affichage"""
+    lines = [f"{summary['games']} parties en {summary['elapsed']:.2f} s "
+             f"({summary['games_per_second']:.1f} parties/s, "
+             f"{summary['pieces_per_second']:.0f} pièces/s)"]
+    header = ''.join(f"{name:>10}" for name in ['mean'] + [f'p{q}' for q in PERCENTILES])
+    lines.append(f"{'':12}{header}")
+    for field in SUMMARY_FIELDS:
+        stats = summary[field]
+        values = ''.join(f"{stats[name]:>10.1f}" for name in ['mean'] + [f'p{q}' for q in PERCENTILES])
+        lines.append(f"{field:12}{values}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lot de parties IA sur plusieurs processus")
+    parser.add_argument('--games', type=int, default=100, help="nombre de parties")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--max-pieces', type=int, default=None,
+                        help="arrêter une partie après ce nombre de pièces")
+    parser.add_argument('--randomizer', choices=['uniform', 'bag'], default='uniform',
+                        help="générateur de pièces")
+    parser.add_argument('--depth', type=int, default=1,
+                        help="pièces anticipées par l'IA (2 = pièce courante et suivante)")
+    parser.add_argument('--backend', choices=AI_BACKENDS, default='python',
+                        help="moteur d'évaluation de l'IA (numpy si disponible)")
+    parser.add_argument('--weights', metavar='FICHIER', default=None,
+                        help="poids d'évaluation de l'IA (produits par tune.py)")
+    args = parser.parse_args()
+    weights = load_weights(args.weights) if args.weights else None
+
+    records, elapsed = run_batch(args.games, seed=args.seed, workers=args.workers,
+                                 max_pieces=args.max_pieces, randomizer=args.randomizer,
+                                 depth=args.depth, backend=args.backend, weights=weights)
+    print(format_summary(summarize(records, elapsed)))
+
+
+if __name__ == "__main__":
+    main()
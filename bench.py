@@ -0,0 +1,384 @@
+"""Mesures de performance du moteur et de l'IA
+
+Les opérations du moteur (Board.is_valid_position, clear_lines, lock_piece),
+l'évaluation de l'IA (AIPlayer._evaluate_placement pour une position,
+_candidates pour toutes les positions d'une pièce), une décision complète
+(AIPlayer._execute_move) et des parties entières sans interface (durée par
+pièce) sont chronométrées sur un corpus fixe de plateaux, obtenu en jouant
+des parties à graine fixée. Le résultat est écrit en JSON (opérations par
+seconde et percentiles des durées) et peut être comparé à une mesure de
+référence enregistrée : la comparaison porte sur les durées médianes.
+
+Avec --sizes, la décision et les parties complètes sont aussi mesurées sur
+des plateaux plus grands (par exemple 20x40 et 40x80), pour suivre le coût
+de l'IA quand la largeur et la hauteur augmentent.
+"""
+import sys
+import json
+import time
+import argparse
+
+from headless import HeadlessGame
+from batch import percentile
+from main import (Board, AIPlayer, MoveSearch, PIECE_TABLE, COLORS, AI_BACKENDS, BOARD_WIDTH,
+                  BOARD_HEIGHT)
+
+# Percentiles des durées d'une opération, en microsecondes
+BENCH_PERCENTILES = [50, 90, 99]
+# Ralentissement toléré par rapport à la référence : d'une exécution à l'autre
+# sur la même machine, les médianes varient jusqu'à 25 % (fréquence du
+# processeur, autres processus)
+BENCH_TOLERANCE = 0.3
+
+
+def build_corpus(size=50, seed=0, interval=5, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+    """Instantanés de plateaux obtenus en jouant des parties à partir de la graine seed
+
+    Un plateau est retenu toutes les interval pièces, juste après l'arrivée
+    d'une nouvelle pièce. Le corpus est identique d'une exécution à l'autre.
+    """
+    corpus = []
+    game_seed = seed
+    while len(corpus) < size:
+        game = HeadlessGame(seed=game_seed, width=width, height=height)
+        pieces = 0
+        while len(corpus) < size and not game.is_over() and game.step():
+            if game.pieces[0] != pieces:
+                pieces = game.pieces[0]
+                if pieces % interval == 0 and not game.boards[0].game_over:
+                    corpus.append(game.boards[0].snapshot())
+        game_seed += 1
+    return corpus
+
+
+def _measure(operations):
+    """Chronomètre chaque opération d'une liste de (préparation, opération)
+
+    La préparation n'est pas chronométrée ; son résultat est passé à
+    l'opération. Renvoie la liste des durées en secondes.
+    """
+    timings = []
+    for setup, operation in operations:
+        argument = setup()
+        start = time.perf_counter()
+        operation(argument)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _repeat(timings, inner, function, *args):
+    """Chronomètre inner appels d'une opération très courte, ramenés à un appel"""
+    start = time.perf_counter()
+    for _ in range(inner):
+        function(*args)
+    timings.append((time.perf_counter() - start) / inner)
+
+
+def bench_is_valid_position(corpus, repeat, inner=100):
+    """Board.is_valid_position pour la pièce courante, une case plus bas"""
+    timings = []
+    boards = [Board.restore(snapshot) for snapshot in corpus]
+    for _ in range(repeat):
+        for board in boards:
+            _repeat(timings, inner, board.is_valid_position, board.current_piece, 0, 1)
+    return timings
+
+
+def _fill_bottom_row(board):
+    """Complète la ligne du bas pour que clear_lines ait une ligne à effacer"""
+    bottom = board.height - 1
+    for x in range(board.width):
+        if board.grid[bottom][x] is None:
+            board.add_block(x, bottom, COLORS['BORDER'])
+    return board
+
+
+def bench_clear_lines(corpus, repeat):
+    """Board.clear_lines sur un plateau dont la ligne du bas est complète"""
+    operations = []
+    for _ in range(repeat):
+        for snapshot in corpus:
+            operations.append((lambda snapshot=snapshot: _fill_bottom_row(Board.restore(snapshot)),
+                               lambda board: board.clear_lines()))
+    return _measure(operations)
+
+
+def _dropped(snapshot):
+    """Plateau recréé avec la pièce courante posée au fond"""
+    board = Board.restore(snapshot)
+    board.current_piece.y = board.hard_drop_y()
+    return board
+
+
+def bench_lock_piece(corpus, repeat):
+    """Board.lock_piece pour la pièce courante lâchée tout droit"""
+    operations = []
+    for _ in range(repeat):
+        for snapshot in corpus:
+            operations.append((lambda snapshot=snapshot: _dropped(snapshot),
+                               lambda board: board.lock_piece()))
+    return _measure(operations)
+
+
+def bench_evaluate_placement(corpus, repeat, inner=100):
+    """AIPlayer._evaluate_placement pour la pièce courante lâchée tout droit"""
+    timings = []
+    for _ in range(repeat):
+        for snapshot in corpus:
+            board = _dropped(snapshot)
+            piece = board.current_piece
+            rotation_data = PIECE_TABLE[piece.shape_name][piece.rotation]
+            player = AIPlayer(board)
+            _repeat(timings, inner, player._evaluate_placement, rotation_data, piece.x, piece.y,
+                    piece.is_special(), board)
+    return timings
+
+
+def _candidates_setup(snapshot, backend):
+    """Joueur neuf (cache vide) et positions énumérées pour la pièce courante"""
+    board = Board.restore(snapshot)
+    piece = board.current_piece
+    placements = MoveSearch(board, piece.shape_name, piece.rotation, piece.x,
+                            piece.y).placements(piece.rotation)
+    return AIPlayer(board, backend=backend), board, piece.shape_name, placements
+
+
+def bench_candidates(corpus, repeat, backend='python'):
+    """AIPlayer._candidates (ou _candidates_numpy) : toutes les positions d'une pièce"""
+    def evaluate(arguments):
+        player, board, shape_name, placements = arguments
+        if player.backend == 'numpy':
+            player._candidates_numpy(board, shape_name, placements)
+        else:
+            player._candidates(board, shape_name, placements)
+
+    operations = []
+    for _ in range(repeat):
+        for snapshot in corpus:
+            operations.append((lambda snapshot=snapshot: _candidates_setup(snapshot, backend),
+                               evaluate))
+    return _measure(operations)
+
+
+def bench_decision(corpus, repeat, depth=1, backend='python'):
+    """AIPlayer._execute_move : recherche complète et application du coup, cache vide"""
+    operations = []
+    for _ in range(repeat):
+        for snapshot in corpus:
+            operations.append((
+                lambda snapshot=snapshot: AIPlayer(Board.restore(snapshot), depth=depth,
+                                             time_budget=float('inf'), backend=backend),
+                lambda player: player._execute_move(),
+            ))
+    return _measure(operations)
+
+
+def bench_games(games, seed, max_pieces, depth=1, backend='python', width=BOARD_WIDTH,
+                height=BOARD_HEIGHT):
+    """Parties complètes sans interface, une durée par pièce jouée pour chaque partie
+
+    Les parties n'ont pas toutes la même longueur : ramener leur durée à une
+    pièce rend les mesures comparables entre elles (et leur médiane stable).
+    """
+    timings = []
+    for game_seed in range(seed, seed + games):
+        game = HeadlessGame(seed=game_seed, max_pieces=max_pieces, depth=depth,
+                            backend=backend, width=width, height=height)
+        start = time.perf_counter()
+        game.run()
+        timings.append((time.perf_counter() - start) / max(1, sum(game.pieces)))
+    return timings
+
+
+def summarize_timings(timings):
+    """Débit et percentiles (en microsecondes) d'une liste de durées"""
+    total = sum(timings)
+    result = {
+        'ops': len(timings),
+        'ops_per_second': len(timings) / total if total else 0.0,
+        'mean_us': total / len(timings) * 1e6 if timings else 0.0,
+    }
+    for q in BENCH_PERCENTILES:
+        result[f'p{q}_us'] = percentile(timings, q) * 1e6
+    return result
+
+
+def parse_size(text):
+    """Lit des dimensions de plateau au format LARGEURxHAUTEUR"""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def scaling_benchmarks(sizes, corpus_size, seed, repeat, games, max_pieces, depth, backend):
+    """Mesures de la décision et des parties complètes pour chaque taille de plateau
+
+    Les noms des mesures sont suffixés par la taille (decision_20x40, game_20x40)
+    pour être comparés à la référence comme les autres.
+    """
+    benchmarks = {}
+    for width, height in sizes:
+        suffix = f'{width}x{height}'
+        corpus = build_corpus(corpus_size, seed, width=width, height=height)
+        benchmarks[f'decision_{suffix}'] = (
+            lambda corpus=corpus: bench_decision(corpus, repeat, depth, backend))
+        benchmarks[f'game_{suffix}'] = (
+            lambda width=width, height=height: bench_games(games, seed, max_pieces, depth,
+                                                           backend, width, height))
+    return benchmarks
+
+
+def run_benchmarks(corpus_size=50, seed=0, repeat=3, games=5, max_pieces=200, depth=1,
+                   backend='python', sizes=()):
+    """Lance toutes les mesures et renvoie le rapport (dictionnaire sérialisable en JSON)
+
+    sizes donne des dimensions (largeur, hauteur) supplémentaires pour
+    lesquelles la décision et les parties complètes sont aussi mesurées.
+    """
+    corpus = build_corpus(corpus_size, seed)
+    benchmarks = {
+        'is_valid_position': lambda: bench_is_valid_position(corpus, repeat),
+        'clear_lines': lambda: bench_clear_lines(corpus, repeat),
+        'lock_piece': lambda: bench_lock_piece(corpus, repeat),
+        'evaluate_placement': lambda: bench_evaluate_placement(corpus, repeat),
+        'candidates': lambda: bench_candidates(corpus, repeat, backend),
+        'decision': lambda: bench_decision(corpus, repeat, depth, backend),
+        'game': lambda: bench_games(games, seed, max_pieces, depth, backend),
+    }
+    benchmarks.update(scaling_benchmarks(sizes, corpus_size, seed, repeat, games, max_pieces,
+                                         depth, backend))
+
+    results = {name: summarize_timings(benchmark()) for name, benchmark in benchmarks.items()}
+    return {
+        'config': bench_config(corpus_size, seed, repeat, games, max_pieces, depth, backend, sizes),
+        'results': results,
+    }
+
+
+def bench_config(corpus_size, seed, repeat, games, max_pieces, depth, backend, sizes):
+    """Configuration d'une mesure, enregistrée dans le rapport"""
+    return {
+        'corpus_size': corpus_size,
+        'seed': seed,
+        'repeat': repeat,
+        'games': games,
+        'max_pieces': max_pieces,
+        'depth': depth,
+        'backend': backend,
+        'sizes': [f'{width}x{height}' for width, height in sizes],
+        'python': sys.version.split()[0],
+    }
+
+
+def config_differences(config, baseline):
+    """Réglages qui diffèrent entre une configuration et celle d'une référence
+
+    Renvoie une liste de (nom, valeur, valeur de référence), None marquant un
+    réglage absent.
+    """
+    reference = baseline.get('config', {})
+    return [(name, config.get(name), reference.get(name))
+            for name in sorted(set(config) | set(reference))
+            if config.get(name) != reference.get(name)]
+
+
+def compare(report, baseline, tolerance=BENCH_TOLERANCE, force=False):
+    """Compare les durées médianes (p50) à celles d'une mesure de référence
+
+    La médiane est peu sensible aux durées aberrantes (ramasse-miettes,
+    ordonnanceur) qui font varier la moyenne et donc le débit. Renvoie une
+    liste de (nom, p50, p50 de référence, rapport, régression) ; le rapport
+    est le gain de vitesse (référence / p50) et une régression est un rapport
+    inférieur à 1 - tolerance.
+
+    Une référence mesurée avec une autre configuration est refusée
+    (ValueError), sauf avec force : l'écart refléterait le changement de
+    réglages plutôt que celui du code.
+    """
+    differences = config_differences(report['config'], baseline)
+    if differences and not force:
+        raise ValueError(format_differences(differences))
+    comparison = []
+    for name, result in report['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference or not result['p50_us'] or not reference.get('p50_us'):
+            continue
+        ratio = reference['p50_us'] / result['p50_us']
+        comparison.append((name, result['p50_us'], reference['p50_us'],
+                           ratio, ratio < 1 - tolerance))
+    return comparison
+
+
+def format_differences(differences):
+    """Met en forme les réglages qui diffèrent de la référence"""
+    lines = ["Configuration différente de la référence :"]
+    for name, value, reference in differences:
+        lines.append(f"  {name} : {value} (référence : {reference})")
+    return '\n'.join(lines)
+
+
+def format_comparison(comparison):
+    """Met en forme la comparaison avec la référence pour l'affichage"""
+    lines = [f"{'':20}{'p50 (µs)':>14}{'référence':>14}{'rapport':>10}"]
+    for name, median, reference, ratio, regression in comparison:
+        flag = '  RÉGRESSION' if regression else ''
+        lines.append(f"{name:20}{median:>14.2f}{reference:>14.2f}{ratio:>10.2f}{flag}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance du moteur et de l'IA")
+    parser.add_argument('--corpus', type=int, default=50, help="nombre de plateaux du corpus")
+    parser.add_argument('--seed', type=int, default=0, help="graine du corpus et des parties")
+    parser.add_argument('--repeat', type=int, default=3, help="passages sur le corpus")
+    parser.add_argument('--games', type=int, default=5, help="parties complètes chronométrées")
+    parser.add_argument('--max-pieces', type=int, default=200,
+                        help="limite de pièces des parties chronométrées")
+    parser.add_argument('--depth', type=int, default=1,
+                        help="pièces anticipées par l'IA (2 = pièce courante et suivante)")
+    parser.add_argument('--backend', choices=AI_BACKENDS, default='python',
+                        help="moteur d'évaluation de l'IA (numpy si disponible)")
+    parser.add_argument('--sizes', type=lambda text: [parse_size(size) for size in text.split(',')],
+                        default=[], metavar='LxH[,LxH...]',
+                        help="tailles de plateau supplémentaires à mesurer, par exemple 20x40,40x80")
+    parser.add_argument('--output', help="fichier JSON où écrire le rapport (sinon sortie standard)")
+    parser.add_argument('--baseline', help="rapport JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE,
+                        help="ralentissement toléré de la durée médiane par rapport à la "
+                             "référence (0.3 = 30 %%)")
+    parser.add_argument('--force', action='store_true',
+                        help="comparer même si la référence a une autre configuration")
+    args = parser.parse_args()
+
+    # La configuration est vérifiée avant les mesures, qui sont longues
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        config = bench_config(args.corpus, args.seed, args.repeat, args.games, args.max_pieces,
+                              args.depth, args.backend, args.sizes)
+        differences = config_differences(config, baseline)
+        if differences:
+            if not args.force:
+                parser.error(format_differences(differences) + "\n(--force pour comparer quand même)")
+            print("Attention : " + format_differences(differences), file=sys.stderr)
+
+    report = run_benchmarks(args.corpus, seed=args.seed, repeat=args.repeat, games=args.games,
+                            max_pieces=args.max_pieces, depth=args.depth, backend=args.backend,
+                            sizes=args.sizes)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if baseline is not None:
+        comparison = compare(report, baseline, args.tolerance, force=args.force)
+        print(format_comparison(comparison), file=sys.stderr)
+        # Code de sortie non nul en cas de régression, pour l'intégration continue
+        if any(regression for *_, regression in comparison):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
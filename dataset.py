@@ -0,0 +1,207 @@
+"""Jeu de données d'auto-apprentissage produit par l'IA
+
+Des parties sans interface sont jouées sur plusieurs processus. Chaque pièce
+verrouillée donne une ligne : plateau avant la pose, pièce, position choisie,
+caractéristiques du plateau après la pose et résultat final de la partie.
+Les lignes sont écrites dans des fragments (shards) numérotés, un fichier
+binaire par groupe de parties, chaque ligne étant précédée de sa longueur.
+
+Un processus ne garde en mémoire que la partie en cours, et seuls quelques
+fragments par processus sont confiés au pool à la fois : la mémoire ne
+dépend pas du nombre de fragments. Un fragment n'est renommé sous son nom
+définitif qu'une fois complet : une génération interrompue ne refait que
+les fragments manquants.
+"""
+import os
+import json
+import struct
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from headless import HeadlessGame
+from main import AI_BACKENDS, BOARD_WIDTH, BOARD_HEIGHT, SHAPE_CODES
+
+DATASET_MAGIC = b'TTRD'
+DATASET_VERSION = 2  # Version 2 : dimensions et coordonnées sur 16 bits
+# En-tête d'un fragment : magie, version, largeur, hauteur
+SHARD_HEADER = struct.Struct('<4sBHH')
+# Longueur de la ligne qui suit
+ROW_LENGTH = struct.Struct('<H')
+# Après le plateau : forme, rotation, x, y, lignes effacées, hauteur de la
+# pile, trous, adjacences, score final et lignes finales de la partie
+ROW_FIELDS = struct.Struct('<BBhhBHHHIH')
+# Fragments confiés au pool à la fois, par processus
+SHARDS_PER_WORKER = 2
+
+# Ligne du jeu de données (rows = masques des lignes du plateau avant la pose)
+DatasetRow = namedtuple('DatasetRow', [
+    'rows', 'shape', 'rotation', 'x', 'y', 'lines_cleared', 'pile_height', 'holes',
+    'adjacencies', 'final_score', 'final_lines',
+])
+
+MANIFEST_NAME = 'dataset.json'
+
+
+class SelfPlayGame(HeadlessGame):
+    """Partie sans interface qui note chaque pose de pièce"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Poses de la partie en cours, complétées par le résultat à la fin
+        self.placements = []
+
+    def _lock(self, index):
+        board = self.boards[index]
+        piece = board.current_piece
+        row_bytes = (board.width + 7) // 8  # Octets par ligne du plateau
+        rows = b''.join(row.to_bytes(row_bytes, 'little') for row in board.rows)
+        placement = (SHAPE_CODES.index(piece.shape_name), piece.rotation, piece.x, piece.y)
+        lines = self.lines[index]
+
+        super()._lock(index)
+
+        features = (self.lines[index] - lines, max(board.heights), board.holes, board.adjacencies)
+        self.placements.append((index, rows, placement + features))
+
+    def encoded_rows(self):
+        """Lignes encodées de la partie terminée, avec le résultat de chaque plateau"""
+        encoded = []
+        for index, rows, fields in self.placements:
+            board = self.boards[index]
+            payload = rows + ROW_FIELDS.pack(*fields, board.score, self.lines[index])
+            encoded.append(ROW_LENGTH.pack(len(payload)) + payload)
+        return encoded
+
+
+def shard_path(directory, shard):
+    return os.path.join(directory, f"shard-{shard:05d}.bin")
+
+
+def write_shard(shard, seeds, directory, max_pieces=None, randomizer='uniform', depth=1,
+                backend='python', width=BOARD_WIDTH, height=BOARD_HEIGHT):
+    """Joue les parties d'un fragment et l'écrit (exécuté dans un processus fils)
+
+    Les lignes sont écrites partie par partie dans un fichier temporaire,
+    renommé une fois le fragment complet. Renvoie le nombre de lignes.
+    """
+    path = shard_path(directory, shard)
+    temporary = path + '.tmp'
+    count = 0
+    with open(temporary, 'wb') as file:
+        file.write(SHARD_HEADER.pack(DATASET_MAGIC, DATASET_VERSION, width, height))
+        for seed in seeds:
+            game = SelfPlayGame(seed=seed, max_pieces=max_pieces, randomizer=randomizer,
+                                depth=depth, backend=backend, width=width, height=height)
+            game.run()
+            rows = game.encoded_rows()
+            file.write(b''.join(rows))
+            count += len(rows)
+    os.replace(temporary, path)
+    return count
+
+
+def read_shard(path):
+    """Parcourt les lignes d'un fragment sans le charger entièrement"""
+    with open(path, 'rb') as file:
+        magic, version, width, height = SHARD_HEADER.unpack(file.read(SHARD_HEADER.size))
+        if magic != DATASET_MAGIC or version != DATASET_VERSION:
+            raise ValueError(f"{path} n'est pas un fragment de jeu de données")
+        row_bytes = (width + 7) // 8
+        board_size = row_bytes * height
+
+        while True:
+            prefix = file.read(ROW_LENGTH.size)
+            if len(prefix) < ROW_LENGTH.size:
+                return
+            payload = file.read(ROW_LENGTH.unpack(prefix)[0])
+            rows = tuple(int.from_bytes(payload[y * row_bytes:(y + 1) * row_bytes], 'little')
+                         for y in range(height))
+            shape, *fields = ROW_FIELDS.unpack_from(payload, board_size)
+            yield DatasetRow(rows, SHAPE_CODES[shape], *fields)
+
+
+def _check_manifest(directory, config):
+    """Écrit la configuration du jeu de données, ou vérifie qu'elle n'a pas changé"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as file:
+            existing = json.load(file)
+        if existing != config:
+            raise ValueError(f"{directory} contient un jeu de données avec une autre configuration : "
+                             f"{existing}")
+        return
+    with open(path, 'w') as file:
+        json.dump(config, file, indent=2)
+
+
+def generate(directory, shards, games_per_shard=10, seed=0, workers=None, max_pieces=None,
+             randomizer='uniform', depth=1, backend='python', width=BOARD_WIDTH,
+             height=BOARD_HEIGHT):
+    """Produit les fragments manquants parmi les shards premiers
+
+    Le fragment i contient les parties de graines seed + i * games_per_shard
+    et suivantes : le résultat ne dépend ni du nombre de processus ni des
+    interruptions. Renvoie le nombre de lignes écrites et de fragments produits.
+    """
+    os.makedirs(directory, exist_ok=True)
+    _check_manifest(directory, {
+        'version': DATASET_VERSION,
+        'width': width,
+        'height': height,
+        'games_per_shard': games_per_shard,
+        'seed': seed,
+        'max_pieces': max_pieces,
+        'randomizer': randomizer,
+        'depth': depth,
+        'backend': backend,
+    })
+
+    # Reprise : les fragments complets sont gardés, les temporaires refaits
+    missing = (shard for shard in range(shards) if not os.path.exists(shard_path(directory, shard)))
+    limit = SHARDS_PER_WORKER * (workers or os.cpu_count() or 1)
+
+    total = produced = 0
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in missing:
+            # Nombre borné de fragments en attente : attendre qu'un se termine
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total += sum(future.result() for future in done)
+            seeds = range(seed + shard * games_per_shard, seed + (shard + 1) * games_per_shard)
+            pending.add(executor.submit(write_shard, shard, seeds, directory, max_pieces,
+                                        randomizer, depth, backend, width, height))
+            produced += 1
+        total += sum(future.result() for future in pending)
+    return total, produced
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jeu de données d'auto-apprentissage de l'IA")
+    parser.add_argument('directory', help="dossier des fragments")
+    parser.add_argument('--shards', type=int, default=10, help="nombre total de fragments")
+    parser.add_argument('--games-per-shard', type=int, default=10, help="parties par fragment")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--max-pieces', type=int, default=None,
+                        help="arrêter une partie après ce nombre de pièces")
+    parser.add_argument('--randomizer', choices=['uniform', 'bag'], default='uniform',
+                        help="générateur de pièces")
+    parser.add_argument('--depth', type=int, default=1,
+                        help="pièces anticipées par l'IA (2 = pièce courante et suivante)")
+    parser.add_argument('--backend', choices=AI_BACKENDS, default='python',
+                        help="moteur d'évaluation de l'IA (numpy si disponible)")
+    parser.add_argument('--width', type=int, default=BOARD_WIDTH, help="largeur des plateaux")
+    parser.add_argument('--height', type=int, default=BOARD_HEIGHT, help="hauteur des plateaux")
+    args = parser.parse_args()
+
+    rows, produced = generate(args.directory, args.shards, args.games_per_shard, seed=args.seed,
+                              workers=args.workers, max_pieces=args.max_pieces,
+                              randomizer=args.randomizer, depth=args.depth, backend=args.backend,
+                              width=args.width, height=args.height)
+    print(f"{produced} fragments produits ({args.shards - produced} déjà présents), {rows} lignes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Simulation de parties IA sans interface graphique
+
+Les règles sont les mêmes que dans TetrisGame.piece_fall / ai_play, mais le
+temps est simulé : chaque plateau avance à son propre rythme (fall_speed) sur
+une SimulatedClock, qui saute directement d'un événement au suivant. Des milliers de parties peuvent
+ainsi être jouées aussi vite que le processeur le permet.
+"""
+import os
+import argparse
+
+from main import (
+    Board,
+    AIPlayer,
+    GameRecorder,
+    GameRules,
+    RULE_SETS,
+    load_weights,
+    PieceSequence,
+    SimulatedClock,
+    AI_BACKENDS,
+    BOARD_WIDTH,
+    BOARD_HEIGHT,
+    RAINBOW_INTERVAL,
+    RAINBOW_DURATION,
+)
+
+
+class HeadlessGame:
+    """Partie entre une ou plusieurs IA, avancée événement par événement"""
+
+    def __init__(self, seed=None, num_boards=1, max_pieces=None, randomizer='uniform', depth=1,
+                 backend='python', record_dir=None, weights=None, rules=None, clock=None,
+                 players=None, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        self.seed = seed
+        self.max_pieces = max_pieces
+        self.ticks = 0
+        self.rules = rules if rules is not None else GameRules()
+
+        # Horloge simulée : le temps saute d'un événement au suivant. Plusieurs
+        # parties peuvent partager la même horloge (voir tournament.py)
+        self.clock = clock if clock is not None else SimulatedClock()
+
+        # Réglages propres à chaque IA (arguments d'AIPlayer), sinon réglages communs
+        if players is not None:
+            num_boards = len(players)
+        else:
+            players = [{'depth': depth, 'backend': backend, 'weights': weights}] * num_boards
+
+        # Chaque plateau a son propre générateur, avec la même graine : toutes
+        # les IA reçoivent la même suite de pièces
+        self.boards = [Board(PieceSequence(seed, randomizer), self.clock, width, height)
+                       for _ in range(num_boards)]
+        # Pas de budget de temps : la recherche est toujours complète, donc reproductible
+        self.players = [AIPlayer(board, time_budget=float('inf'), **options)
+                        for board, options in zip(self.boards, players)]
+
+        # Un journal par plateau si l'enregistrement est demandé
+        self.recorders = []
+        if record_dir is not None:
+            os.makedirs(record_dir, exist_ok=True)
+            self.recorders = [
+                GameRecorder.attach(board, os.path.join(record_dir, f"partie-{seed}-ia{index + 1}.ttr"))
+                for index, board in enumerate(self.boards)
+            ]
+
+        # Statistiques de chaque plateau
+        self.lines = [0] * num_boards
+        self.pieces = [0] * num_boards
+        self.max_height = [0] * num_boards
+
+        for index, board in enumerate(self.boards):
+            board.new_piece()
+            self.clock.schedule(board.fall_speed, self._tick, index)
+        self.clock.schedule(RAINBOW_INTERVAL, self._toggle_rainbow, True)
+
+    @property
+    def time(self):
+        """Temps de jeu simulé (secondes)"""
+        return self.clock.now()
+
+    def is_over(self):
+        """La partie s'arrête dès qu'un plateau est perdu, comme dans l'interface"""
+        if any(board.game_over for board in self.boards):
+            return True
+        return self.max_pieces is not None and max(self.pieces) >= self.max_pieces
+
+    def step(self):
+        """Avance l'horloge jusqu'au prochain événement et l'exécute"""
+        return self.clock.advance()
+
+    def run(self):
+        """Joue la partie jusqu'au bout et renvoie les résultats de chaque plateau"""
+        while not self.is_over() and self.clock.advance():
+            pass
+        self.close()
+        return self.results()
+
+    def close(self):
+        """Ferme les journaux de la partie"""
+        for recorder in self.recorders:
+            recorder.close()
+
+    def results(self):
+        """Résultats de la partie, un dictionnaire par plateau"""
+        return [
+            {
+                'score': board.score,
+                'lines': self.lines[index],
+                'pieces': self.pieces[index],
+                'max_height': self.max_height[index],
+                'duration': self.time,
+                'lost': board.game_over,
+            }
+            for index, board in enumerate(self.boards)
+        ]
+
+    def _tick(self, index):
+        """Même logique que TetrisGame.ai_play, avec une réflexion instantanée"""
+        if self.is_over():
+            return
+
+        self.ticks += 1
+        board = self.boards[index]
+        player = self.players[index]
+
+        player.apply_move(player.find_best_move())
+
+        if not board.try_move(0, 1):
+            self._lock(index)
+
+        self.clock.schedule(board.fall_speed, self._tick, index)
+
+    def _lock(self, index):
+        """Verrouille la pièce d'un plateau et applique les règles spéciales"""
+        board = self.boards[index]
+        lines_cleared = board.lock_piece()
+        self.lines[index] += lines_cleared
+        self.pieces[index] += 1
+        self.max_height[index] = max(self.max_height[index], max(board.heights))
+
+        # Cadeau surprise et pause douceur entre les plateaux de la partie
+        self.rules.on_lock(board, lines_cleared, self.boards)
+
+        board.new_piece()
+
+    def _toggle_rainbow(self, enable):
+        """Active ou désactive l'arc-en-ciel, puis programme le changement suivant"""
+        for board in self.boards:
+            board.toggle_rainbow_mode(enable)
+
+        if enable:
+            self.clock.schedule(RAINBOW_DURATION, self._toggle_rainbow, False)
+        else:
+            self.clock.schedule(RAINBOW_INTERVAL, self._toggle_rainbow, True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parties IA sans interface graphique")
+    parser.add_argument('--games', type=int, default=1, help="nombre de parties")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--boards', type=int, default=1, help="nombre d'IA par partie")
+    parser.add_argument('--max-pieces', type=int, default=None,
+                        help="arrêter une partie après ce nombre de pièces")
+    parser.add_argument('--randomizer', choices=['uniform', 'bag'], default='uniform',
+                        help="générateur de pièces")
+    parser.add_argument('--depth', type=int, default=1,
+                        help="pièces anticipées par l'IA (2 = pièce courante et suivante)")
+    parser.add_argument('--backend', choices=AI_BACKENDS, default='python',
+                        help="moteur d'évaluation de l'IA (numpy si disponible)")
+    parser.add_argument('--rules', choices=list(RULE_SETS), default='classic',
+                        help="règles spéciales entre plateaux")
+    parser.add_argument('--weights', metavar='FICHIER', default=None,
+                        help="poids d'évaluation de l'IA (produits par tune.py)")
+    parser.add_argument('--record', metavar='DOSSIER', default=None,
+                        help="enregistrer chaque plateau dans ce dossier (voir replay.py)")
+    parser.add_argument('--width', type=int, default=BOARD_WIDTH, help="largeur des plateaux (cases)")
+    parser.add_argument('--height', type=int, default=BOARD_HEIGHT, help="hauteur des plateaux (cases)")
+    args = parser.parse_args()
+    weights = load_weights(args.weights) if args.weights else None
+
+    for game_index in range(args.games):
+        seed = args.seed + game_index
+        game = HeadlessGame(seed=seed, num_boards=args.boards, max_pieces=args.max_pieces,
+                            randomizer=args.randomizer, depth=args.depth,
+                            backend=args.backend, record_dir=args.record, weights=weights,
+                            rules=RULE_SETS[args.rules](), width=args.width, height=args.height)
+        for board_index, result in enumerate(game.run()):
+            print(f"Partie {seed} / IA {board_index + 1} : score {result['score']}, "
+                  f"{result['lines']} lignes, {result['pieces']} pièces, "
+                  f"hauteur max {result['max_height']}, {result['duration']:.1f} s simulées")
+
+
+if __name__ == "__main__":
+    main()
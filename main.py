@@ -1,20 +1,52 @@
-import tkinter as tk
-from tkinter import messagebox
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+except ImportError:
+    # Tkinter n'est nécessaire que pour l'interface : les simulations s'en passent
+    tk = None
+    messagebox = None
+import os
+import sys
 import random
+import argparse
+import struct
 import time
-import threading
+import queue
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import json
+import heapq
+import itertools
+from collections import namedtuple, OrderedDict, deque
+from operator import itemgetter
 from enum import Enum
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy est optionnel : sans lui, l'IA garde l'évaluation en Python pur
+    np = None
+
 # Définition des constantes
+# Dimensions par défaut d'un plateau (en cases) et taille d'une case à l'écran
+# (en pixels) ; chaque Board et chaque TetrisGame peut en choisir d'autres
 BOARD_WIDTH = 10
 BOARD_HEIGHT = 20
 BLOCK_SIZE = 30
 AI_THINKING_TIME = 0.5  # Temps que l'IA prend pour "réfléchir" (secondes)
+AI_BEAM_WIDTH = 6  # Positions conservées à chaque niveau de la recherche avec anticipation
+AI_CACHE_SIZE = 50000  # Nombre maximal d'évaluations gardées en cache par l'IA
+AI_BACKENDS = ['python', 'numpy']  # Moteurs d'évaluation des positions de l'IA
+AI_HISTORY_SIZE = 100  # Décisions récentes gardées par l'IA quand le profilage est actif
+RENDER_FPS = 60  # Nombre maximal d'images affichées par seconde
 SPECIAL_PIECE_BONUS = 100
 RAINBOW_INTERVAL = 120  # 2 minutes en secondes
 RAINBOW_DURATION = 20  # 20 secondes
+RAINBOW_SPEED = 10  # Défilement des couleurs arc-en-ciel (degrés de teinte par seconde)
+SLOWDOWN_FACTOR = 1.2  # Pause douceur : les pièces tombent 20% plus lentement
+SLOWDOWN_DURATION = 10  # pendant 10 secondes
 
 # Couleurs pour les pièces
 COLORS = {
@@ -74,25 +106,294 @@ SHAPES = {
     ]
 }
 
+# Code d'une case dans les instantanés de plateau (0 = vide, puis une couleur
+# par forme). Une case d'une autre couleur reçoit le dernier code, CELL_OTHER,
+# et revient grise : l'occupation de la grille est toujours conservée
+CELL_COLORS = [None] + [COLORS[shape_name] for shape_name in SHAPES] + [COLORS['BORDER']]
+CELL_CODES = {color: code for code, color in enumerate(CELL_COLORS)}
+CELL_OTHER = len(CELL_COLORS) - 1
+
+# Données précalculées pour une rotation d'une pièce
+PieceRotation = namedtuple('PieceRotation', [
+    'blocks',     # Décalages (x, y) des blocs, normalisés pour commencer en (0, 0)
+    'x_shift',    # Décalage entre piece.x et la colonne la plus à gauche de la forme
+    'y_shift',    # Décalage entre piece.y et la ligne la plus haute de la forme
+    'width',
+    'height',
+    'bottom',     # Pour chaque colonne de la forme, décalage y du bloc le plus bas
+    'top',        # Pour chaque colonne de la forme, décalage y du bloc le plus haut
+    'column_counts',  # Nombre de blocs dans chaque colonne de la forme
+    'row_masks',  # Masque binaire de chaque ligne de la forme (bit 0 = colonne de gauche)
+    'row_counts',  # Nombre de blocs dans chaque ligne de la forme
+    'adjacencies',  # Adjacences entre blocs de la pièce (comptées dans les deux sens)
+    'min_x',      # Plus petite valeur légale de piece.x (la plus grande dépend de la largeur du plateau)
+])
+
+def popcount(value):
+    """Nombre de bits à 1 dans un masque"""
+    return bin(value).count('1')
+
+# Même calcul sans passer par une chaîne de caractères (Python 3.10 et plus)
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+
+def _build_piece_table():
+    """Précalcule les données de placement de chaque forme et de chaque rotation"""
+    table = {}
+    for shape_name, rotations in SHAPES.items():
+        entries = []
+        for shape in rotations:
+            x_shift = min(x for x, _ in shape)
+            y_shift = min(y for _, y in shape)
+            blocks = tuple(sorted((x - x_shift, y - y_shift) for x, y in shape))
+            width = max(x for x, _ in blocks) + 1
+            height = max(y for _, y in blocks) + 1
+            
+            bottom = tuple(max(y for x, y in blocks if x == col) for col in range(width))
+            top = tuple(min(y for x, y in blocks if x == col) for col in range(width))
+            column_counts = tuple(sum(1 for x, _ in blocks if x == col) for col in range(width))
+            row_masks = tuple(
+                sum(1 << x for x, y in blocks if y == row) for row in range(height)
+            )
+            row_counts = tuple(popcount(mask) for mask in row_masks)
+            adjacencies = sum(
+                1 for x, y in blocks for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]
+                if (x + dx, y + dy) in blocks
+            )
+            
+            entries.append(PieceRotation(
+                blocks=blocks,
+                x_shift=x_shift,
+                y_shift=y_shift,
+                width=width,
+                height=height,
+                bottom=bottom,
+                top=top,
+                column_counts=column_counts,
+                row_masks=row_masks,
+                row_counts=row_counts,
+                adjacencies=adjacencies,
+                min_x=-x_shift,
+            ))
+        table[shape_name] = tuple(entries)
+    return table
+
+# Table des placements, construite une seule fois au chargement du module
+PIECE_TABLE = _build_piece_table()
+
+# Classe pour un événement programmé sur l'horloge du jeu
+class ClockEvent:
+    __slots__ = ('time', 'callback', 'args', 'cancelled')
+    
+    def __init__(self, time, callback, args):
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+
+# Classe pour l'horloge du jeu
+class GameClock:
+    """Horloge de jeu monotone avec une file de priorité d'événements
+    
+    Tous les délais du jeu (chute des pièces, IA, ralentissement, arc-en-ciel)
+    sont programmés ici. Le temps de jeu s'arrête pendant la pause, les
+    événements gardent donc leur délai restant. Les rappels sont exécutés par
+    run_due(), appelée depuis la boucle principale : aucun plateau n'est
+    modifié hors du thread principal.
+    """
+    def __init__(self):
+        self._queue = []  # Tas de (instant, numéro, événement)
+        self._counter = itertools.count()
+        self._paused_at = None
+        self._paused_total = 0.0  # Temps passé en pause
+    
+    def _source_time(self):
+        """Temps de la source (horloge monotone du système)"""
+        return time.monotonic()
+    
+    def now(self):
+        """Temps de jeu écoulé, pauses exclues"""
+        if self._paused_at is not None:
+            return self._paused_at - self._paused_total
+        return self._source_time() - self._paused_total
+    
+    @property
+    def paused(self):
+        return self._paused_at is not None
+    
+    def schedule(self, delay, callback, *args):
+        """Programme callback(*args) dans delay secondes de jeu"""
+        event = ClockEvent(self.now() + delay, callback, args)
+        heapq.heappush(self._queue, (event.time, next(self._counter), event))
+        return event
+    
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = self._source_time()
+    
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused_total += self._source_time() - self._paused_at
+            self._paused_at = None
+    
+    def clear(self):
+        """Annule tous les événements programmés"""
+        for _, _, event in self._queue:
+            event.cancel()
+        self._queue = []
+    
+    def next_time(self):
+        """Instant du prochain événement, ou None si la file est vide"""
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else None
+    
+    def run_due(self):
+        """Exécute les événements arrivés à échéance ; renvoie leur nombre"""
+        if self._paused_at is not None:
+            return 0
+        
+        now = self.now()
+        executed = 0
+        while self._queue and self._queue[0][0] <= now:
+            _, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            event.callback(*event.args)
+            executed += 1
+        return executed
+
+class SimulatedClock(GameClock):
+    """Horloge des simulations : le temps saute directement au prochain événement"""
+    def __init__(self):
+        super().__init__()
+        self._time = 0.0
+    
+    def _source_time(self):
+        return self._time
+    
+    def advance(self):
+        """Avance jusqu'au prochain événement et l'exécute ; renvoie False si la file est vide"""
+        next_time = self.next_time()
+        if next_time is None or self.paused:
+            return False
+        
+        self._time = max(self._time, next_time + self._paused_total)
+        self.run_due()
+        return True
+
+# Pièces normales, tirées par les générateurs de pièces
+NORMAL_PIECE_TYPES = ['I', 'J', 'L', 'O', 'S', 'T', 'Z']
+
+# Stratégies de tirage disponibles pour PieceSequence
+RANDOMIZERS = ['uniform', 'bag', 'replay']
+
+# Classe pour générer la suite des pièces d'un plateau
+class PieceSequence:
+    """Suite de pièces propre à un plateau, reproductible grâce à une graine
+    
+    - 'uniform' : chaque pièce est tirée au hasard (comportement d'origine)
+    - 'bag' : les 7 pièces sont mélangées dans un sac, vidé avant d'en tirer un nouveau
+    - 'replay' : les pièces de la liste donnée sont rejouées dans l'ordre
+    
+    Les pièces sont précalculées par blocs pour que le tirage soit en O(1).
+    Les tirages des règles spéciales (pièce facile offerte, pièce rigolote)
+    utilisent un second générateur, dérivé de la même graine : deux plateaux
+    de même graine reçoivent la même suite quel que soit leur nombre de
+    tirages de règles.
+    """
+    CHUNK_SIZE = 252  # Multiple de 7 pour ne pas couper un sac
+    
+    def __init__(self, seed=None, randomizer='uniform', pieces=None):
+        if randomizer not in RANDOMIZERS:
+            raise ValueError(f"Générateur de pièces inconnu : {randomizer}")
+        if randomizer == 'replay' and pieces is None:
+            raise ValueError("Le mode 'replay' nécessite une liste de pièces")
+        
+        self.seed = seed
+        self.randomizer = randomizer
+        self.rng = random.Random(seed)
+        self.rules_rng = random.Random(None if seed is None else f'regles-{seed}')
+        self.drawn = 0  # Nombre de pièces déjà tirées
+        self._buffer = list(pieces) if randomizer == 'replay' else []
+        self._index = 0
+    
+    def next_shape(self):
+        """Renvoie le nom de la prochaine pièce de la suite"""
+        if self._index >= len(self._buffer):
+            self._fill()
+        
+        shape_name = self._buffer[self._index]
+        self._index += 1
+        self.drawn += 1
+        return shape_name
+    
+    def choice(self, options):
+        """Tirage parmi des options, avec le générateur des règles spéciales"""
+        return self.rules_rng.choice(options)
+    
+    def _fill(self):
+        """Précalcule le bloc de pièces suivant"""
+        if self.randomizer == 'replay':
+            raise IndexError(f"Suite rejouée épuisée après {self.drawn} pièces")
+        
+        if self.randomizer == 'bag':
+            buffer = []
+            for _ in range(self.CHUNK_SIZE // len(NORMAL_PIECE_TYPES)):
+                bag = NORMAL_PIECE_TYPES[:]
+                self.rng.shuffle(bag)
+                buffer.extend(bag)
+        else:
+            choice = self.rng.choice
+            buffer = [choice(NORMAL_PIECE_TYPES) for _ in range(self.CHUNK_SIZE)]
+        
+        self._buffer = buffer
+        self._index = 0
+
+# Instantané immuable d'une pièce : forme, rotation, position et identifiant
+PieceSnapshot = namedtuple('PieceSnapshot', ['shape_name', 'rotation', 'x', 'y', 'id'])
+
+# Instantané immuable d'un plateau : une case par octet (CELL_CODES, ligne par
+# ligne), dimensions, pièces, score, niveau et compteurs. Hachable et compact à
+# sérialiser
+BoardSnapshot = namedtuple('BoardSnapshot', [
+    'cells', 'width', 'height', 'current_piece', 'next_piece', 'score', 'level', 'special_piece_counter',
+    'speed_modifier', 'rainbow_mode', 'game_over',
+])
+
 # Classe pour représenter une pièce de Tetris
 class Piece:
-    def __init__(self, shape_name=None):
+    __slots__ = ('shape_name', 'rotation', 'x', 'y', 'shapes', 'color', 'id')
+    
+    # Identifiants uniques des pièces créées
+    _ids = itertools.count(1)
+    
+    def __init__(self, shape_name=None, board_width=BOARD_WIDTH):
         if shape_name is None:
             # Pièce aléatoire normale
-            self.shape_name = random.choice(['I', 'J', 'L', 'O', 'S', 'T', 'Z'])
+            self.shape_name = random.choice(NORMAL_PIECE_TYPES)
         else:
             self.shape_name = shape_name
             
         self.rotation = 0
-        self.x = BOARD_WIDTH // 2 - 1
+        self.x = board_width // 2 - 1  # Apparition au milieu du plateau
         self.y = 0
         self.shapes = SHAPES[self.shape_name]
         self.color = COLORS[self.shape_name]
+        self.id = next(Piece._ids)
         
     def get_blocks(self):
         shape = self.shapes[self.rotation % len(self.shapes)]
         return [(self.x + x, self.y + y) for x, y in shape]
     
+    def get_rotation_data(self):
+        """Renvoie les données précalculées de la rotation courante"""
+        rotations = PIECE_TABLE[self.shape_name]
+        return rotations[self.rotation % len(rotations)]
+    
     def rotate(self):
         self.rotation = (self.rotation + 1) % len(self.shapes)
     
@@ -102,11 +403,39 @@ class Piece:
     
     def is_special(self):
         return self.shape_name in ['HEART', 'STAR']
+    
+    def snapshot(self):
+        """Instantané immuable de la pièce"""
+        return PieceSnapshot(self.shape_name, self.rotation, self.x, self.y, self.id)
+    
+    @classmethod
+    def restore(cls, snapshot):
+        """Recrée une pièce à partir de son instantané (même identifiant)"""
+        piece = cls(snapshot.shape_name)
+        piece.rotation = snapshot.rotation
+        piece.x = snapshot.x
+        piece.y = snapshot.y
+        piece.id = snapshot.id
+        return piece
 
 # Classe pour représenter le plateau de jeu
 class Board:
-    def __init__(self):
-        self.grid = [[None for _ in range(BOARD_WIDTH)] for _ in range(BOARD_HEIGHT)]
+    def __init__(self, sequence=None, clock=None, width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        # Dimensions du plateau, en cases
+        self.width = width
+        self.height = height
+        self.full_row_mask = (1 << width) - 1  # Masque d'une ligne entièrement remplie
+        # Couleurs des cases (None = vide)
+        self.grid = [[None for _ in range(self.width)] for _ in range(self.height)]
+        # Masque binaire de chaque ligne (bit x = case occupée), parallèle à self.grid
+        self.rows = [0] * self.height
+        # Caractéristiques maintenues au fil du jeu pour l'évaluation de l'IA
+        self.heights = [0] * self.width  # Hauteur de chaque colonne (0 = colonne vide)
+        self.row_fill = [0] * self.height  # Nombre de blocs dans chaque ligne
+        self.column_fill = [0] * self.width  # Nombre de blocs dans chaque colonne
+        self.column_holes = [0] * self.width  # Cases vides sous le sommet de chaque colonne
+        self.holes = 0
+        self.adjacencies = 0  # Paires de blocs voisins (comptées dans les deux sens)
         self.current_piece = None
         self.next_piece = None
         self.score = 0
@@ -119,22 +448,36 @@ class Board:
         self.special_piece_types = ['HEART', 'STAR']
         self.easy_piece_types = ['O', 'I']
         self.special_piece_counter = 0
+        # Générateur des pièces du plateau (indépendant de celui des autres plateaux)
+        self.sequence = sequence if sequence is not None else PieceSequence()
+        # Horloge sur laquelle sont programmés les effets de vitesse
+        self.clock = clock if clock is not None else GameClock()
+        # Enregistreur optionnel de la partie (voir replay.GameRecorder)
+        self.recorder = None
         
     def new_piece(self, specific_piece=None):
+        recorder = self.recorder
         if specific_piece:
-            self.current_piece = Piece(specific_piece)
+            self.current_piece = Piece(specific_piece, self.width)
+            if recorder is not None:
+                recorder.current(specific_piece, self.clock.now())
         elif self.next_piece:
             self.current_piece = self.next_piece
             # Vérification pour ajouter une pièce spéciale
             if self.special_piece_counter >= 3000:
                 self.special_piece_counter = 0
-                self.next_piece = Piece(random.choice(self.special_piece_types))
+                self.next_piece = Piece(self.sequence.choice(self.special_piece_types), self.width)
             else:
-                self.next_piece = Piece()
+                self.next_piece = Piece(self.sequence.next_shape(), self.width)
+            if recorder is not None:
+                recorder.piece(self.next_piece.shape_name, self.clock.now())
         else:
             # Au premier tour seulement
-            self.current_piece = Piece()
-            self.next_piece = Piece()
+            self.current_piece = Piece(self.sequence.next_shape(), self.width)
+            self.next_piece = Piece(self.sequence.next_shape(), self.width)
+            if recorder is not None:
+                recorder.piece(self.current_piece.shape_name, self.clock.now())
+                recorder.piece(self.next_piece.shape_name, self.clock.now())
         
         # Vérifier si la pièce peut être placée
         if not self.is_valid_position():
@@ -143,26 +486,64 @@ class Board:
         
         return True
     
+    def give_easy_piece(self):
+        """Cadeau surprise: la prochaine pièce devient une pièce facile"""
+        self.next_piece = Piece(self.sequence.choice(self.easy_piece_types), self.width)
+        if self.recorder is not None:
+            self.recorder.gift(self.next_piece.shape_name, self.clock.now())
+    
     def is_valid_position(self, piece=None, x_offset=0, y_offset=0):
         if piece is None:
             piece = self.current_piece
         
-        # Récupérer les blocs de la pièce
-        blocks = piece.get_blocks()
+        return self.is_valid_placement(piece.get_rotation_data(),
+                                       piece.x + x_offset, piece.y + y_offset)
+    
+    def is_valid_placement(self, rotation_data, x, y):
+        """Vérifie si une rotation précalculée peut être placée en (x, y)"""
+        # Position de la case en haut à gauche de la forme
+        left = x + rotation_data.x_shift
+        top = y + rotation_data.y_shift
+        
+        # Vérifier que la forme reste dans la grille
+        if (left < 0 or left + rotation_data.width > self.width or
+                top < 0 or top + rotation_data.height > self.height):
+            return False
         
-        for x, y in blocks:
-            # Ajout des offsets
-            test_x = x + x_offset
-            test_y = y + y_offset
-            
-            # Vérifier si la position est valide
-            if (test_x < 0 or test_x >= BOARD_WIDTH or 
-                test_y < 0 or test_y >= BOARD_HEIGHT or
-                (test_y >= 0 and self.grid[test_y][test_x] is not None)):
+        # Un seul ET binaire par ligne de la pièce pour détecter les collisions
+        rows = self.rows
+        for row, mask in enumerate(rotation_data.row_masks):
+            if rows[top + row] & (mask << left):
                 return False
                 
         return True
     
+    def drop_y(self, rotation_data, x, y):
+        """Renvoie la ligne d'atterrissage d'une rotation précalculée lâchée depuis (x, y)"""
+        left = x + rotation_data.x_shift
+        heights = self.heights
+        
+        # La pièce se pose sur la colonne où le sommet de la pile est le plus proche de son bas
+        landing_top = self.height - 1 - max(
+            heights[left + col] + bottom for col, bottom in enumerate(rotation_data.bottom)
+        )
+        
+        if landing_top >= y + rotation_data.y_shift:
+            return landing_top - rotation_data.y_shift
+        
+        # La pièce est déjà sous le sommet d'une colonne (sous un surplomb) :
+        # on la fait descendre case par case
+        while self.is_valid_placement(rotation_data, x, y + 1):
+            y += 1
+        return y
+    
+    def hard_drop_y(self, piece=None):
+        """Renvoie la position y où la pièce se poserait si on la lâchait"""
+        if piece is None:
+            piece = self.current_piece
+        
+        return self.drop_y(piece.get_rotation_data(), piece.x, piece.y)
+    
     def try_rotate(self):
         if not self.current_piece:
             return False
@@ -194,17 +575,22 @@ class Board:
     def lock_piece(self):
         if not self.current_piece:
             return 0
+        
+        if self.recorder is not None:
+            self.recorder.lock(self.current_piece, self.clock.now())
             
         blocks = self.current_piece.get_blocks()
         is_special = self.current_piece.is_special()
         
         # Ajouter la pièce à la grille
+        touched = set()
         for x, y in blocks:
-            if 0 <= y < BOARD_HEIGHT and 0 <= x < BOARD_WIDTH:
-                self.grid[y][x] = self.current_piece.color
+            if 0 <= y < self.height and 0 <= x < self.width:
+                self.add_block(x, y, self.current_piece.color)
+                touched.add(y)
         
-        # Vérifier les lignes complètes
-        lines_cleared = self.clear_lines()
+        # Seules les lignes touchées par la pièce peuvent être complètes
+        lines_cleared = self.clear_lines(touched)
         
         # Mettre à jour le score
         points = self.calculate_score(lines_cleared)
@@ -222,6 +608,116 @@ class Board:
         
         return lines_cleared
     
+    def clone(self):
+        """Copie légère du plateau pour la recherche de l'IA
+        
+        La grille et les caractéristiques sont copiées ; les pièces et le
+        générateur de pièces restent partagés avec l'original. La copie n'est
+        pas enregistrée.
+        """
+        clone = copy.copy(self)
+        clone.recorder = None
+        clone.grid = [row[:] for row in self.grid]
+        clone.rows = self.rows[:]
+        clone.heights = self.heights[:]
+        clone.row_fill = self.row_fill[:]
+        clone.column_fill = self.column_fill[:]
+        clone.column_holes = self.column_holes[:]
+        return clone
+    
+    def snapshot(self):
+        """Instantané immuable du plateau (grille, pièces, score et compteurs)
+        
+        Le générateur de pièces, l'horloge et les caractéristiques dérivées de
+        la grille n'en font pas partie : restore les recalcule.
+        """
+        return BoardSnapshot(
+            cells=bytes(CELL_CODES.get(color, CELL_OTHER) for row in self.grid for color in row),
+            width=self.width,
+            height=self.height,
+            current_piece=self.current_piece.snapshot() if self.current_piece else None,
+            next_piece=self.next_piece.snapshot() if self.next_piece else None,
+            score=self.score,
+            level=self.level,
+            special_piece_counter=self.special_piece_counter,
+            speed_modifier=self.speed_modifier,
+            rainbow_mode=self.rainbow_mode,
+            game_over=self.game_over,
+        )
+    
+    @classmethod
+    def restore(cls, snapshot, sequence=None, clock=None):
+        """Recrée un plateau à partir d'un instantané"""
+        board = cls(sequence, clock, snapshot.width, snapshot.height)
+        width = board.width
+        cells = snapshot.cells
+        for y in range(board.height):
+            row_cells = cells[y * width:(y + 1) * width]
+            if not any(row_cells):
+                continue
+            
+            grid_row = board.grid[y]
+            mask = 0
+            for x, code in enumerate(row_cells):
+                if code:
+                    grid_row[x] = CELL_COLORS[code]
+                    mask |= 1 << x
+                    board.column_fill[x] += 1
+            board.rows[y] = mask
+            board.row_fill[y] = popcount(mask)
+        # Hauteurs, trous et adjacences à partir des lignes reconstruites
+        board.update_features()
+        
+        if snapshot.current_piece is not None:
+            board.current_piece = Piece.restore(snapshot.current_piece)
+        if snapshot.next_piece is not None:
+            board.next_piece = Piece.restore(snapshot.next_piece)
+        board.score = snapshot.score
+        board.level = snapshot.level
+        board.special_piece_counter = snapshot.special_piece_counter
+        board.speed_modifier = snapshot.speed_modifier
+        board.rainbow_mode = snapshot.rainbow_mode
+        board.game_over = snapshot.game_over
+        board.update_fall_speed()
+        return board
+    
+    def place(self, rotation_data, x, y, color):
+        """Pose une rotation précalculée en (x, y) et efface les lignes complètes
+        
+        Contrairement à lock_piece, le score et le niveau ne changent pas. La
+        couleur est obligatoire : une case de couleur None serait vide dans
+        la grille et dans les instantanés.
+        """
+        left = x + rotation_data.x_shift
+        top = y + rotation_data.y_shift
+        for block_x, block_y in rotation_data.blocks:
+            self.add_block(left + block_x, top + block_y, color)
+        
+        return self.clear_lines(range(top, top + rotation_data.height))
+    
+    def add_block(self, x, y, color):
+        """Ajoute un bloc à la grille et met à jour les caractéristiques"""
+        rows = self.rows
+        bit = 1 << x
+        
+        # Compter les voisins déjà présents avant d'ajouter le bloc
+        neighbours = popcount(rows[y] & ((bit << 1) | (bit >> 1)))
+        if y > 0 and rows[y - 1] & bit:
+            neighbours += 1
+        if y < self.height - 1 and rows[y + 1] & bit:
+            neighbours += 1
+        self.adjacencies += 2 * neighbours
+        
+        self.grid[y][x] = color
+        rows[y] |= bit
+        self.row_fill[y] += 1
+        self.column_fill[x] += 1
+        self.heights[x] = max(self.heights[x], self.height - y)
+        
+        holes = self.heights[x] - self.column_fill[x]
+        self.holes += holes - self.column_holes[x]
+        self.column_holes[x] = holes
+    
     def calculate_score(self, lines_cleared):
         if lines_cleared == 0:
             return 0
@@ -235,26 +731,105 @@ class Board:
             return 500  # 50*4 + 300 bonus
         return 0
     
-    def clear_lines(self):
-        lines_to_clear = []
+    def full_rows(self, rows=None):
+        """Lignes complètes parmi rows (toutes les lignes si None), de haut en bas
         
-        # Trouver les lignes complètes
-        for y in range(BOARD_HEIGHT):
-            if all(self.grid[y][x] is not None for x in range(BOARD_WIDTH)):
-                lines_to_clear.append(y)
+        Une ligne est complète quand son compteur row_fill vaut la largeur.
+        """
+        row_fill = self.row_fill
+        if rows is None:
+            rows = range(self.height)
+        return sorted(y for y in set(rows) if row_fill[y] == self.width)
+    
+    def clear_lines(self, rows=None):
+        """Efface les lignes complètes parmi rows (toutes si None) et renvoie leur nombre
         
-        # Effacer les lignes et faire descendre les blocs
-        for y in lines_to_clear:
-            # Déplacer toutes les lignes au-dessus vers le bas
-            for y2 in range(y, 0, -1):
-                for x in range(BOARD_WIDTH):
-                    self.grid[y2][x] = self.grid[y2-1][x]
-            
-            # Effacer la ligne du haut
-            for x in range(BOARD_WIDTH):
-                self.grid[0][x] = None
+        lock_piece et place ne passent que les lignes touchées par la pièce.
+        Les caractéristiques sont mises à jour sans reparcourir la grille.
+        """
+        cleared = self.full_rows(rows)
+        lines_cleared = len(cleared)
+        if not lines_cleared:
+            return 0
+        
+        masks = self.rows
+        removed = set(cleared)
+        
+        # Adjacences : paires perdues avec les lignes effacées (une ligne
+        # complète a largeur - 1 paires horizontales)...
+        pairs = 0
+        for y in cleared:
+            pairs -= self.width - 1
+            if y > 0 and y - 1 not in removed:
+                pairs -= popcount(masks[y - 1])
+            if y < self.height - 1:
+                pairs -= popcount(masks[y + 1])
+        # ... et paires gagnées entre les lignes qui se retrouvent voisines
+        for y in cleared:
+            if y > 0 and y - 1 not in removed:
+                below = y + 1
+                while below in removed:
+                    below += 1
+                if below < self.height:
+                    pairs += popcount(masks[y - 1] & masks[below])
+        self.adjacencies += 2 * pairs
+        
+        # Compactage en une passe : lignes gardées sous des lignes vides neuves
+        kept_rows = [y for y in range(self.height) if y not in removed]
+        self.rows = [0] * lines_cleared + [masks[y] for y in kept_rows]
+        self.grid = ([[None] * self.width for _ in range(lines_cleared)] +
+                     [self.grid[y] for y in kept_rows])
+        self.row_fill = [0] * lines_cleared + [self.row_fill[y] for y in kept_rows]
+        
+        # Chaque ligne effacée retire exactement un bloc de chaque colonne, et
+        # chaque sommet de colonne descend d'autant, sauf s'il était lui-même
+        # dans une ligne effacée : on cherche alors le bloc le plus haut restant
+        self.column_fill = [count - lines_cleared for count in self.column_fill]
+        heights = self.heights
+        for x in range(self.width):
+            if self.height - heights[x] in removed:
+                bit = 1 << x
+                heights[x] = next((self.height - y for y, row in enumerate(self.rows) if row & bit), 0)
+            else:
+                heights[x] -= lines_cleared
+        self.column_holes = [height - count for height, count in zip(heights, self.column_fill)]
+        self.holes = sum(self.column_holes)
         
-        return len(lines_to_clear)
+        return lines_cleared
+    
+    def update_heights(self):
+        """Recalcule la hauteur des colonnes à partir des masques de lignes"""
+        heights = [0] * self.width
+        remaining = self.full_row_mask
+        
+        # Parcourir les lignes de haut en bas : le premier bloc trouvé fixe la hauteur
+        for y, row in enumerate(self.rows):
+            found = row & remaining
+            if found:
+                remaining &= ~found
+                # Seuls les bits à 1 sont visités, pas toute la largeur
+                while found:
+                    bit = found & -found
+                    heights[bit.bit_length() - 1] = self.height - y
+                    found ^= bit
+                if not remaining:
+                    break
+        
+        self.heights = heights
+    
+    def update_features(self):
+        """Recalcule hauteurs, trous et adjacences à partir des lignes du plateau"""
+        self.update_heights()
+        
+        self.column_holes = [height - count
+                             for height, count in zip(self.heights, self.column_fill)]
+        self.holes = sum(self.column_holes)
+        
+        # Paires horizontales dans chaque ligne et verticales entre lignes consécutives
+        rows = self.rows
+        pairs = sum(popcount(row & (row >> 1)) for row in rows)
+        pairs += sum(popcount(rows[y] & rows[y + 1]) for y in range(self.height - 1))
+        self.adjacencies = 2 * pairs
     
     def update_fall_speed(self):
         # La vitesse de base diminue avec le niveau (tombe plus vite)
@@ -263,17 +838,17 @@ class Board:
     
     def apply_slowdown(self):
         """Ralentit la vitesse de chute de 20% pendant 10 secondes"""
-        self.speed_modifier = 1.2  # 20% plus lent
+        self.speed_modifier = SLOWDOWN_FACTOR  # 20% plus lent
         self.update_fall_speed()
+        if self.recorder is not None:
+            self.recorder.slowdown(self.clock.now())
         
         # Annuler le timer précédent s'il existe
         if self.speed_modifier_timer:
             self.speed_modifier_timer.cancel()
         
-        # Créer un nouveau timer pour revenir à la vitesse normale
-        self.speed_modifier_timer = threading.Timer(10.0, self.reset_speed)
-        self.speed_modifier_timer.daemon = True
-        self.speed_modifier_timer.start()
+        # Programmer le retour à la vitesse normale
+        self.speed_modifier_timer = self.clock.schedule(SLOWDOWN_DURATION, self.reset_speed)
     
     def reset_speed(self):
         """Réinitialise la vitesse de chute à la normale"""
@@ -284,6 +859,118 @@ class Board:
     def toggle_rainbow_mode(self, enable):
         """Active ou désactive le mode arc-en-ciel"""
         self.rainbow_mode = enable
+        if self.recorder is not None:
+            self.recorder.rainbow(enable, self.clock.now())
+
+# Journal binaire d'une partie, un fichier par plateau :
+# en-tête (magie, version, générateur, largeur, hauteur, graine ou -1) puis
+# un enregistrement de 10 octets par événement (type, valeur, x, y, instant en
+# millisecondes de temps de jeu)
+LOG_MAGIC = b'TTRL'
+LOG_VERSION = 2  # Version 2 : dimensions et coordonnées sur 16 bits
+LOG_HEADER = struct.Struct('<4sBBHHq')
+LOG_EVENT = struct.Struct('<BBhhI')
+LOG_MAX_SIZE = 0x7FFF  # Une coordonnée doit tenir dans un entier signé de 16 bits
+SHAPE_CODES = list(SHAPES)  # Code d'une forme dans le journal = rang dans SHAPES
+
+EVENT_PIECE = 1  # Nouvelle pièce suivante (valeur = forme)
+EVENT_CURRENT = 2  # Pièce courante imposée (valeur = forme)
+EVENT_LOCK = 3  # Pièce verrouillée (valeur = rotation, x, y = position)
+EVENT_GIFT = 4  # Pièce facile offerte (valeur = forme)
+EVENT_SLOWDOWN = 5  # Pause douceur
+EVENT_RAINBOW = 6  # Arc-en-ciel (valeur = 1 activé, 0 désactivé)
+
+class GameRecorder:
+    """Enregistre les événements d'un plateau dans un journal binaire
+    
+    Les événements sont écrits au fil de la partie ; le fichier est vidé sur
+    le disque à chaque pièce verrouillée. Voir replay.py pour la relecture.
+    """
+    def __init__(self, path, seed=None, randomizer='uniform', width=BOARD_WIDTH, height=BOARD_HEIGHT):
+        if not (0 < width <= LOG_MAX_SIZE and 0 < height <= LOG_MAX_SIZE):
+            raise ValueError(f"Plateau {width}x{height} trop grand pour le journal "
+                             f"(au plus {LOG_MAX_SIZE} cases par côté)")
+        self.path = path
+        self.events = 0
+        self._file = open(path, 'wb')
+        self._file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, RANDOMIZERS.index(randomizer),
+                                         width, height, -1 if seed is None else seed))
+    
+    @classmethod
+    def attach(cls, board, path):
+        """Enregistre un plateau (avant sa première pièce) dans le fichier path"""
+        board.recorder = cls(path, board.sequence.seed, board.sequence.randomizer,
+                             board.width, board.height)
+        return board.recorder
+    
+    def _write(self, kind, value, x, y, game_time):
+        self._file.write(LOG_EVENT.pack(kind, value, x, y, int(game_time * 1000)))
+        self.events += 1
+    
+    def piece(self, shape_name, game_time):
+        self._write(EVENT_PIECE, SHAPE_CODES.index(shape_name), 0, 0, game_time)
+    
+    def current(self, shape_name, game_time):
+        self._write(EVENT_CURRENT, SHAPE_CODES.index(shape_name), 0, 0, game_time)
+    
+    def lock(self, piece, game_time):
+        self._write(EVENT_LOCK, piece.rotation, piece.x, piece.y, game_time)
+        self._file.flush()
+    
+    def gift(self, shape_name, game_time):
+        self._write(EVENT_GIFT, SHAPE_CODES.index(shape_name), 0, 0, game_time)
+    
+    def slowdown(self, game_time):
+        self._write(EVENT_SLOWDOWN, 0, 0, 0, game_time)
+    
+    def rainbow(self, enable, game_time):
+        self._write(EVENT_RAINBOW, int(enable), 0, 0, game_time)
+    
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+# Règles spéciales entre plateaux
+class GameRules:
+    """Règles appliquées après chaque pièce verrouillée (règles d'origine)
+    
+    - Cadeau surprise : 2 lignes d'un coup offrent une pièce facile aux adversaires
+    - Pause douceur : passer un multiple de 1000 points ralentit tous les plateaux
+    
+    Une variante redéfinit gives_gift et/ou triggers_slowdown.
+    """
+    def gives_gift(self, board, lines_cleared):
+        return lines_cleared == 2
+    
+    def triggers_slowdown(self, board, lines_cleared):
+        return board.score // 1000 > (board.score - lines_cleared * 50) // 1000
+    
+    def on_lock(self, board, lines_cleared, boards):
+        """Applique les règles après un verrouillage sur board, parmi tous les plateaux boards
+        
+        Renvoie True si les plateaux ont été ralentis.
+        """
+        if self.gives_gift(board, lines_cleared):
+            for other in boards:
+                if other is not board:
+                    other.give_easy_piece()
+        
+        if self.triggers_slowdown(board, lines_cleared):
+            for other in boards:
+                other.apply_slowdown()
+            return True
+        return False
+
+class NoSpecialRules(GameRules):
+    """Tetris classique : ni cadeau ni ralentissement"""
+    def gives_gift(self, board, lines_cleared):
+        return False
+    
+    def triggers_slowdown(self, board, lines_cleared):
+        return False
+
+# Jeux de règles disponibles pour les simulations
+RULE_SETS = {'classic': GameRules, 'none': NoSpecialRules}
 
 # Classe pour le joueur humain
 class HumanPlayer:
@@ -293,12 +980,343 @@ class HumanPlayer:
     
     # Pas besoin d'implémenter de logique ici car le joueur contrôle via les touches
 
+# Cache des évaluations de l'IA
+class EvaluationCache:
+    """Cache LRU borné des évaluations de positions, avec compteurs de succès"""
+    def __init__(self, max_size=AI_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    def get(self, key):
+        """Renvoie la valeur en cache pour key, ou None"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key, value):
+        """Ajoute une valeur en oubliant la plus ancienne si le cache est plein"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self):
+        """Compteurs d'utilisation du cache"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+# Entrées d'un chemin de la pièce : déplacement (dx, dy) ou rotation
+MOVE_LEFT = 'left'
+MOVE_RIGHT = 'right'
+MOVE_DOWN = 'down'
+MOVE_ROTATE = 'rotate'
+
+class MoveSearch:
+    """Positions de verrouillage atteignables par une pièce, avec leur chemin
+    
+    Parcours en largeur des états (rotation, x, y) depuis la position de
+    départ, avec les mêmes déplacements que le joueur : gauche, droite, bas et
+    rotation (Board.try_rotate, sans décalage contre les murs). Un état est
+    une position de verrouillage quand la pièce ne peut plus descendre. Les
+    glissements et rotations sous un surplomb sont donc trouvés.
+    
+    Au-dessus de la pile, toutes les positions dans la grille sont libres :
+    pour chaque rotation et chaque colonne, la pièce descend tout droit
+    jusqu'à la surface de la pile sans que ces états soient parcourus un à
+    un. Le parcours ne part que des glissements et rotations qui mènent sous
+    la surface d'une autre colonne.
+    """
+    
+    def __init__(self, board, shape_name, rotation, x, y):
+        self.board = board
+        self.shape_name = shape_name
+        self.rotations = PIECE_TABLE[shape_name]
+        # Plus grande valeur légale de x pour chaque rotation, sur ce plateau
+        self.max_x = [board.width - data.width - data.x_shift for data in self.rotations]
+        self.start = (rotation % len(self.rotations), x, y)
+        # Pour chaque état atteint par le parcours : (état précédent, entrée),
+        # ou (None, (rotations, rotation d'abord)) pour les états de départ
+        self._parents = {}
+        # Chutes libres : pour (rotation, x), lignes de départ et d'atterrissage
+        self._drops = {}
+        # Positions de verrouillage, dans l'ordre de découverte
+        self.locks = []
+        self._search()
+    
+    def _seeds(self):
+        """États de départ du parcours
+        
+        Renvoie une liste de (état, (nombre de rotations, rotation avant le
+        déplacement horizontal)).
+        """
+        rotations = self.rotations
+        max_x = self.max_x
+        rotation_index, start_x, start_y = self.start
+        # Première ligne occupée de la pile
+        sky = self.board.height - max(self.board.heights)
+        
+        if any(start_y + data.y_shift + data.height > sky for data in rotations):
+            # La pièce touche déjà la pile : parcours complet depuis le départ
+            if self.board.is_valid_placement(rotations[rotation_index], start_x, start_y):
+                return [(self.start, (0, True))]
+            return []
+        
+        seeds = []
+        for turns in range(len(rotations)):
+            index = (rotation_index + turns) % len(rotations)
+            rotation_data = rotations[index]
+            # Dernière ligne où la pièce est entièrement au-dessus de la pile
+            y = sky - rotation_data.height - rotation_data.y_shift
+            # Chaque rotation intermédiaire doit tenir dans la grille
+            turned = [(step_index, rotations[step_index].min_x)
+                      for step_index in ((rotation_index + step) % len(rotations)
+                                         for step in range(1, turns + 1))]
+            turn_first = all(low <= start_x <= max_x[i] for i, low in turned)
+            
+            for x in range(rotation_data.min_x, max_x[index] + 1):
+                if turn_first:
+                    seeds.append(((index, x, y), (turns, True)))
+                elif all(low <= x <= max_x[i] for i, low in turned):
+                    seeds.append(((index, x, y), (turns, False)))
+                # Sinon, l'état est atteint par le parcours depuis une colonne voisine
+        return seeds
+    
+    def _search(self):
+        board = self.board
+        rotations = self.rotations
+        count = len(rotations)
+        parents = self._parents
+        drops = self._drops
+        locks = self.locks
+        width = board.width
+        height = board.height
+        
+        # Plateau et rotations sous forme d'entiers : ligne y aux bits y * largeur
+        # et suivants, pour tester une position avec un seul ET binaire
+        cells = 0
+        for y, row in enumerate(board.rows):
+            cells |= row << (y * width)
+        masks = [sum(mask << (row * width) for row, mask in enumerate(data.row_masks))
+                 for data in rotations]
+        
+        # États déjà vus (bloqués compris), indexés par rotation et case en haut à gauche
+        visited = bytearray(count * height * width)
+        
+        def reach(rotation_index, x, y):
+            """Index de l'état s'il est libre et pas encore vu, sinon -1"""
+            data = rotations[rotation_index]
+            left = x + data.x_shift
+            top = y + data.y_shift
+            if (left < 0 or left + data.width > width or
+                    top < 0 or top + data.height > height):
+                return -1
+            drop = drops.get((rotation_index, x))
+            if drop is not None and drop[0] <= y <= drop[1]:
+                # Déjà atteint par la chute libre de sa colonne
+                return -1
+            index = (rotation_index * height + top) * width + left
+            if visited[index]:
+                return -1
+            visited[index] = 1
+            if cells & (masks[rotation_index] << (top * width + left)):
+                return -1
+            return index
+        
+        pending = deque()
+        seeds = self._seeds()
+        if len(seeds) == 1 and seeds[0][0] == self.start:
+            # Départ déjà dans la pile : tout est parcouru état par état
+            reach(*self.start)
+            parents[self.start] = (None, seeds[0][1])
+            pending.append(self.start)
+        else:
+            # Chute libre de chaque état de départ jusqu'à la surface de la pile
+            for (rotation_index, x, y), prefix in seeds:
+                landing = board.drop_y(rotations[rotation_index], x, y)
+                drops[(rotation_index, x)] = (y, landing)
+                parents[(rotation_index, x, y)] = (None, prefix)
+                locks.append((rotation_index, x, landing))
+            
+            # Glissements et rotations depuis une chute libre vers une ligne
+            # située sous la surface de la colonne voisine
+            for (rotation_index, x), (first, landing) in drops.items():
+                for move, target_rotation, target_x in (
+                    (MOVE_LEFT, rotation_index, x - 1),
+                    (MOVE_RIGHT, rotation_index, x + 1),
+                    (MOVE_ROTATE, (rotation_index + 1) % count, x),
+                ):
+                    target_drop = drops.get((target_rotation, target_x))
+                    lowest = first if target_drop is None else max(first, target_drop[1] + 1)
+                    for y in range(lowest, landing + 1):
+                        if reach(target_rotation, target_x, y) >= 0:
+                            target = (target_rotation, target_x, y)
+                            parents[target] = ((rotation_index, x, y), move)
+                            pending.append(target)
+        
+        while pending:
+            state = pending.popleft()
+            rotation_index, x, y = state
+            
+            below = (rotation_index, x, y + 1)
+            if reach(*below) >= 0:
+                parents[below] = (state, MOVE_DOWN)
+                pending.append(below)
+            elif below not in parents:
+                # Case du dessous bloquée (ou déjà vue bloquée) : la pièce se verrouille
+                locks.append(state)
+            
+            for move, target in (
+                (MOVE_LEFT, (rotation_index, x - 1, y)),
+                (MOVE_RIGHT, (rotation_index, x + 1, y)),
+                (MOVE_ROTATE, ((rotation_index + 1) % count, x, y)),
+            ):
+                if reach(*target) >= 0:
+                    parents[target] = (state, move)
+                    pending.append(target)
+    
+    def placements(self, base_rotation):
+        """Positions de verrouillage sous la forme (rotation, rotation_index, x, y)
+        
+        rotation est le nombre de rotations à partir de base_rotation. Deux
+        positions qui occupent les mêmes cases ne sont données qu'une fois ;
+        l'ordre est celui des rotations, puis des colonnes, puis des lignes.
+        """
+        rotations = self.rotations
+        placements = []
+        seen = set()
+        for rotation_index, x, y in self.locks:
+            rotation_data = rotations[rotation_index]
+            cells = (rotation_data.blocks, x + rotation_data.x_shift, y + rotation_data.y_shift)
+            if cells in seen:
+                continue
+            seen.add(cells)
+            placements.append(((rotation_index - base_rotation) % len(rotations),
+                               rotation_index, x, y))
+        placements.sort()
+        return placements
+    
+    def path(self, rotation_index, x, y):
+        """Entrées qui mènent la pièce du départ à l'état donné (vide s'il n'est pas atteint)"""
+        moves = []
+        state = (rotation_index, x, y)
+        while True:
+            if state not in self._parents:
+                # État d'une chute libre : descentes depuis l'état de départ de sa colonne
+                drop = self._drops.get(state[:2])
+                if drop is None or not drop[0] <= state[2] <= drop[1]:
+                    return []
+                moves.extend([MOVE_DOWN] * (state[2] - drop[0]))
+                state = (state[0], state[1], drop[0])
+            previous, move = self._parents[state]
+            if previous is None:
+                break
+            moves.append(move)
+            state = previous
+        moves.reverse()
+        
+        # Chemin jusqu'à l'état de départ : rotations et déplacement
+        # horizontal depuis la position initiale, puis descente
+        turns, turn_first = move
+        _, start_x, start_y = self.start
+        _, seed_x, seed_y = state
+        shift = [MOVE_LEFT] * (start_x - seed_x) + [MOVE_RIGHT] * (seed_x - start_x)
+        rotate = [MOVE_ROTATE] * turns
+        prefix = rotate + shift if turn_first else shift + rotate
+        return prefix + [MOVE_DOWN] * (seed_y - start_y) + moves
+
+# Poids des critères d'évaluation d'une position : lignes complétées, hauteur
+# de la pile, trous, adjacences et bonus des pièces spéciales
+EvaluationWeights = namedtuple('EvaluationWeights', ['lines', 'height', 'holes', 'adjacencies', 'special'])
+DEFAULT_WEIGHTS = EvaluationWeights(lines=100, height=-2, holes=-5, adjacencies=1, special=50)
+
+def load_weights(path):
+    """Lit des poids d'évaluation enregistrés (par save_weights ou tune.py)"""
+    with open(path) as file:
+        data = json.load(file)
+    return EvaluationWeights(**data['weights'])
+
+def save_weights(weights, path, **info):
+    """Enregistre des poids d'évaluation en JSON, avec des informations libres"""
+    with open(path, 'w') as file:
+        json.dump({'weights': weights._asdict(), **info}, file, indent=2)
+
+# Profil d'une décision de l'IA : positions évaluées (anticipation comprise),
+# temps d'énumération des positions de la pièce courante et temps d'évaluation
+# (secondes), rotation et colonne choisies, meilleur score et écart avec le
+# deuxième meilleur
+AIDecision = namedtuple('AIDecision', [
+    'piece_id', 'shape', 'candidates', 'generation_time', 'evaluation_time',
+    'rotation', 'x', 'score', 'margin',
+])
+
 # Classe pour le joueur IA
 class AIPlayer:
-    def __init__(self, board):
-        self.board = board
+    def __init__(self, board, depth=1, beam_width=AI_BEAM_WIDTH, time_budget=None,
+                 backend='python', executor=None, on_decision=None, weights=None):
+        if backend not in AI_BACKENDS:
+            raise ValueError(f"Moteur d'évaluation inconnu : {backend}")
+        
+        self._board = board
         self.name = "IA"
         self.thinking = False
+        # Nombre de pièces connues prises en compte : 1 = pièce courante seule,
+        # 2 = pièce courante et pièce suivante
+        self.depth = depth
+        self.beam_width = beam_width
+        # Temps maximal de recherche par coup (secondes) ; remplace AI_THINKING_TIME
+        # quand l'IA anticipe
+        self.time_budget = time_budget
+        # Évaluations déjà calculées, indexées par état du plateau. Le cache
+        # n'est manipulé que par le thread qui cherche : un changement de
+        # plateau est seulement signalé en changeant de génération
+        self.cache = EvaluationCache()
+        self._generation = 0
+        self._cache_generation = 0
+        # Exécuteur optionnel pour chercher hors du thread principal ; les coups
+        # trouvés attendent dans decisions que le thread principal les applique
+        self.executor = executor
+        self.decisions = queue.Queue()
+        # Profilage des décisions : actif si profile vaut True ou si un
+        # callback on_decision est donné (appelé par le thread qui cherche).
+        # Les dernières décisions sont gardées dans history
+        self.profile = False
+        self.on_decision = on_decision
+        self.history = deque(maxlen=AI_HISTORY_SIZE)
+        self.evaluations = 0  # Positions évaluées depuis la création
+        self.search_errors = 0  # Recherches en arrière-plan terminées par une exception
+        # Poids des critères d'évaluation (DEFAULT_WEIGHTS si non précisés)
+        self.weights = EvaluationWeights(*weights) if weights is not None else DEFAULT_WEIGHTS
+        # Sans NumPy, le moteur vectorisé retombe sur le calcul en Python pur
+        self.backend = backend if np is not None else 'python'
+    
+    @property
+    def board(self):
+        return self._board
+    
+    @board.setter
+    def board(self, board):
+        # Un nouveau plateau (partie redémarrée) rend le cache inutile et
+        # annule le coup en préparation
+        self._board = board
+        self.thinking = False
+        self._generation += 1
     
     def make_move(self):
         """Logique simple pour l'IA pour jouer au Tetris"""
@@ -307,167 +1325,548 @@ class AIPlayer:
         
         self.thinking = True
         
-        # Simuler un temps de "réflexion" pour l'IA
-        threading.Timer(AI_THINKING_TIME, self._execute_move).start()
+        # Simuler un temps de "réflexion" pour l'IA ; avec l'anticipation, la
+        # recherche elle-même occupe ce temps
+        delay = AI_THINKING_TIME if self.depth <= 1 else 0
+        self.board.clock.schedule(delay, self._start_search)
+    
+    def _start_search(self):
+        """Lance la recherche, dans l'exécuteur s'il y en a un, sinon immédiatement"""
+        if self.executor is None:
+            self._execute_move()
+            return
+        
+        if self.board.game_over or not self.board.current_piece:
+            self.thinking = False
+            return
+        
+        # Instantané immuable : le thread principal peut continuer à modifier
+        # le vrai plateau pendant la recherche
+        future = self.executor.submit(self._decide, self.board.snapshot())
+        future.add_done_callback(self.decisions.put)
+    
+    def _decide(self, snapshot):
+        """Cherche le coup sur un instantané du plateau (exécuté par l'exécuteur)
+        
+        Renvoie l'identifiant de la pièce, sa ligne de départ et le chemin trouvé.
+        """
+        board = Board.restore(snapshot)
+        piece = board.current_piece
+        return piece.id, piece.y, self.find_best_move(board)
+    
+    def apply_decisions(self):
+        """Applique les coups trouvés en arrière-plan (depuis le thread principal)
+        
+        Les coups calculés pour une pièce déjà verrouillée sont ignorés. Une
+        recherche qui a échoué est signalée sur la sortie d'erreur et
+        abandonnée : la pièce tombe sans coup et l'IA relance une recherche
+        au tick suivant, sans bloquer la boucle d'affichage.
+        Renvoie True si un coup a été joué.
+        """
+        played = False
+        while True:
+            try:
+                future = self.decisions.get_nowait()
+            except queue.Empty:
+                return played
+            
+            self.thinking = False
+            try:
+                piece_id, start_y, path = future.result()
+            except Exception as error:
+                self.search_errors += 1
+                print("Erreur pendant la recherche de l'IA :", file=sys.stderr)
+                traceback.print_exception(type(error), error, error.__traceback__)
+                continue
+            
+            piece = self.board.current_piece
+            if self.board.game_over or piece is None or piece.id != piece_id:
+                continue
+            
+            # La pièce a pu tomber pendant la recherche : ces lignes sont déjà descendues
+            self.apply_move(path, fallen=piece.y - start_y)
+            played = True
     
     def _execute_move(self):
         """Exécute le meilleur mouvement déterminé par l'IA"""
-        if self.board.game_over:
+        if self.board.game_over or not self.board.current_piece:
             self.thinking = False
             return
-            
-        best_score = -float('inf')
-        best_rotation = 0
-        best_x = 0
         
-        # Tester toutes les rotations et positions possibles
-        original_piece = copy.deepcopy(self.board.current_piece)
+        self.apply_move(self.find_best_move())
         
-        for rotation in range(len(SHAPES[original_piece.shape_name])):
-            # Faire tourner la pièce jusqu'à la rotation actuelle
-            test_piece = copy.deepcopy(original_piece)
-            for _ in range(rotation):
-                test_piece.rotate()
-                
-            # Tester chaque position horizontale possible
-            min_x = -test_piece.x
-            max_x = BOARD_WIDTH - max(x for x, _ in test_piece.get_blocks()) - 1
-            
-            for test_x in range(min_x, max_x + 1):
-                # Créer une copie de la pièce pour les tests
-                test_piece = copy.deepcopy(original_piece)
-                for _ in range(rotation):
-                    test_piece.rotate()
-                
-                # Déplacer la pièce horizontalement
-                test_piece.x += test_x
-                
-                # Faire tomber la pièce jusqu'en bas
-                landing_y = 0
-                while True:
-                    test_piece.y += 1
-                    if not self._is_valid_position(test_piece):
-                        test_piece.y -= 1
-                        landing_y = test_piece.y
-                        break
-                
-                # Évaluer cette position
-                score = self._evaluate_position(test_piece)
-                
-                if score > best_score:
-                    best_score = score
-                    best_rotation = rotation
-                    best_x = test_x
-        
-        # Exécuter le meilleur mouvement
-        for _ in range(best_rotation):
-            self.board.try_rotate()
-        
-        # Déplacer horizontalement
-        dx = best_x
-        if dx < 0:
-            for _ in range(abs(dx)):
-                self.board.try_move(-1, 0)
+        self.thinking = False
+    
+    def find_best_move(self, board=None):
+        """Cherche le meilleur coup pour la pièce courante
+        
+        Renvoie le chemin (liste d'entrées MOVE_*) qui mène la pièce à la
+        position de verrouillage choisie.
+        """
+        if board is None:
+            board = self.board
+        
+        # Le plateau a changé depuis la dernière recherche : oublier le cache
+        if self._cache_generation != self._generation:
+            self.cache.clear()
+            self._cache_generation = self._generation
+        
+        piece = board.current_piece
+        # Sans profilage, seul le test ci-dessous est ajouté à la recherche
+        profiling = self.profile or self.on_decision is not None
+        if profiling:
+            start = time.perf_counter()
+            evaluations = self.evaluations
+        
+        search = MoveSearch(board, piece.shape_name, piece.rotation, piece.x, piece.y)
+        placements = search.placements(piece.rotation)
+        if not placements:
+            # La pièce chevauche déjà la pile (fin de partie) : elle reste sur place
+            placements = [(0, search.start[0], piece.x, piece.y)]
+        if profiling:
+            generated = time.perf_counter()
+        
+        if self.backend == 'numpy':
+            candidates = self._candidates_numpy(board, piece.shape_name, placements)
         else:
-            for _ in range(dx):
-                self.board.try_move(1, 0)
+            # Sans anticipation, chaque position n'est évaluée qu'une fois par
+            # plateau : le cache ne servirait jamais. Avec anticipation, les
+            # positions de la pièce courante ont souvent été évaluées au coup
+            # précédent, sur le plateau simulé pour la pièce suivante
+            cache = self.cache if self.depth > 1 else None
+            candidates = self._candidates(board, piece.shape_name, placements, cache)
+        
+        if self.depth > 1 and board.next_piece:
+            scored = self._search_lookahead(board, candidates)
+        else:
+            scored = candidates
+        
+        # max garde la première position en cas d'égalité
+        best_value, best_rotation, best_x, best_y = max(scored, key=itemgetter(0))
+        best_index = (piece.rotation + best_rotation) % len(piece.shapes)
+        
+        if profiling:
+            values = heapq.nlargest(2, [value for value, _, _, _ in scored])
+            decision = AIDecision(
+                piece_id=piece.id,
+                shape=piece.shape_name,
+                candidates=self.evaluations - evaluations,
+                generation_time=generated - start,
+                evaluation_time=time.perf_counter() - generated,
+                rotation=best_index,
+                x=best_x,
+                score=best_value,
+                margin=values[0] - values[1] if len(values) > 1 else 0,
+            )
+            self.history.append(decision)
+            if self.on_decision is not None:
+                self.on_decision(decision)
+        
+        return search.path(best_index, best_x, best_y)
+    
+    def _candidates(self, board, shape_name, placements, cache=None):
+        """Évalue des positions énumérées par MoveSearch.placements
         
-        # Faire tomber la pièce jusqu'en bas
-        while self.board.try_move(0, 1):
-            pass
+        Les scores sont lus et enregistrés dans cache s'il est donné.
+        Renvoie une liste de tuples (score, rotation, x, y) dans le même ordre.
+        """
+        candidates = []
+        rotations = PIECE_TABLE[shape_name]
+        is_special = shape_name in board.special_piece_types
+        if cache is not None:
+            board_key = tuple(board.rows)
+        self.evaluations += len(placements)
+        # Grandeurs du plateau communes à toutes les positions, calculées une fois
+        totals = (board.row_fill.count(board.width), max(board.heights))
+        
+        for rotation, rotation_index, test_x, landing_y in placements:
+            if cache is not None:
+                key = (board_key, shape_name, rotation_index, test_x, landing_y)
+                score = cache.get(key)
+            else:
+                score = None
+            if score is None:
+                rotation_data = rotations[rotation_index]
+                if board.is_valid_placement(rotation_data, test_x, landing_y):
+                    score = self._evaluate_placement(rotation_data, test_x, landing_y,
+                                                     is_special, board, totals)
+                else:
+                    # La pièce chevauche déjà la pile (fin de partie) : évaluation complète
+                    blocks = [(test_x + rotation_data.x_shift + x, landing_y + rotation_data.y_shift + y)
+                              for x, y in rotation_data.blocks]
+                    score = self._evaluate_blocks(blocks, is_special, board)
+                if cache is not None:
+                    cache.put(key, score)
+            
+            candidates.append((score, rotation, test_x, landing_y))
         
-        self.thinking = False
+        return candidates
     
-    def _is_valid_position(self, piece):
-        """Vérifie si la position d'une pièce est valide"""
-        blocks = piece.get_blocks()
+    def _candidates_numpy(self, board, shape_name, placements):
+        """Même résultat que _candidates, en évaluant toutes les positions d'un coup
         
-        for x, y in blocks:
-            # Vérifier si la position est valide
-            if (x < 0 or x >= BOARD_WIDTH or 
-                y < 0 or y >= BOARD_HEIGHT or
-                (y >= 0 and self.board.grid[y][x] is not None)):
+        Chaque position donne une grille booléenne ; les grilles sont empilées
+        dans un tableau (positions, hauteur, largeur) et les critères de
+        _evaluate_blocks sont calculés pour toutes en une seule passe.
+        """
+        rotations = PIECE_TABLE[shape_name]
+        self.evaluations += len(placements)
+        
+        # Cases occupées par chaque position
+        cell_index, cell_y, cell_x = [], [], []
+        for index, (_, rotation_index, test_x, landing_y) in enumerate(placements):
+            rotation_data = rotations[rotation_index]
+            left = test_x + rotation_data.x_shift
+            top = landing_y + rotation_data.y_shift
+            for x, y in rotation_data.blocks:
+                cell_index.append(index)
+                cell_y.append(top + y)
+                cell_x.append(left + x)
+        
+        # Grille du plateau répétée pour chaque position, puis ajout des pièces.
+        # Les masques passent par des octets : la largeur n'est pas limitée à 64
+        row_bytes = (board.width + 7) // 8
+        packed = np.frombuffer(b''.join(row.to_bytes(row_bytes, 'little') for row in board.rows),
+                               dtype=np.uint8)
+        grid = np.unpackbits(packed.reshape(board.height, row_bytes), axis=1,
+                             bitorder='little')[:, :board.width].astype(bool)
+        grids = np.repeat(grid[None], len(placements), axis=0)
+        grids[cell_index, cell_y, cell_x] = True
+        
+        # 1. Lignes complétées
+        lines_cleared = grids.all(axis=2).sum(axis=1)
+        
+        # 2. Hauteur de la pile
+        filled_rows = grids.any(axis=2)
+        pile_height = np.where(filled_rows.any(axis=1),
+                               board.height - filled_rows.argmax(axis=1), 0)
+        
+        # 3. Trous : cases vides sous le premier bloc de chaque colonne
+        below_block = np.logical_or.accumulate(grids, axis=1)
+        holes = (below_block & ~grids).sum(axis=(1, 2))
+        
+        # 4. Adjacences, comptées dans les deux sens
+        adjacencies = 2 * ((grids[:, :, 1:] & grids[:, :, :-1]).sum(axis=(1, 2)) +
+                           (grids[:, 1:, :] & grids[:, :-1, :]).sum(axis=(1, 2)))
+        
+        weights = self.weights
+        scores = (lines_cleared * weights.lines + pile_height * weights.height +
+                  holes * weights.holes + adjacencies * weights.adjacencies)
+        
+        # 5. Bonus pour les pièces spéciales
+        if shape_name in board.special_piece_types:
+            scores += weights.special
+        
+        return [(score, rotation, x, y)
+                for score, (rotation, _, x, y) in zip(scores.tolist(), placements)]
+    
+    def _search_lookahead(self, board, candidates):
+        """Recherche en faisceau sur la pièce courante puis la suivante
+        
+        Chaque position retenue est notée par son score plus le meilleur score
+        de la pièce suivante sur le plateau obtenu. La recherche s'arrête à la
+        fin du budget de temps (au moins une position est toujours examinée).
+        Renvoie les positions examinées, sous la forme (valeur, rotation, x, y).
+        """
+        budget = self.time_budget if self.time_budget is not None else board.fall_speed / 2
+        deadline = time.perf_counter() + budget
+        
+        piece = board.current_piece
+        next_shape = board.next_piece.shape_name
+        rotations = PIECE_TABLE[piece.shape_name]
+        
+        beam = heapq.nlargest(self.beam_width, candidates, key=itemgetter(0))
+        scored = []
+        for score, rotation, x, y in beam:
+            rotation_data = rotations[(piece.rotation + rotation) % len(rotations)]
+            child = board.clone()
+            child.place(rotation_data, x, y, piece.color)
+            
+            scored.append((score + self._next_piece_value(child, next_shape), rotation, x, y))
+            
+            if time.perf_counter() > deadline:
+                break
+        
+        return scored
+    
+    def _next_piece_value(self, board, shape_name):
+        """Meilleur score de la pièce suivante sur un plateau simulé"""
+        key = (tuple(board.rows), shape_name)
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        
+        rotations = PIECE_TABLE[shape_name]
+        spawn_x = board.width // 2 - 1
+        
+        if board.is_valid_placement(rotations[0], spawn_x, 0):
+            placements = MoveSearch(board, shape_name, 0, spawn_x, 0).placements(0)
+            candidates = self._candidates(board, shape_name, placements, self.cache)
+            value = max(score for score, _, _, _ in candidates)
+        else:
+            # La pièce ne peut pas apparaître : la partie serait perdue
+            value = -float('inf')
+        
+        self.cache.put(key, value)
+        return value
+    
+    def apply_move(self, path, fallen=0):
+        """Joue les entrées d'un chemin trouvé par find_best_move
+        
+        Les fallen premières descentes sont sautées (la pièce est déjà tombée
+        d'autant). Si une entrée échoue, le plateau a changé depuis la
+        recherche : la pièce est lâchée là où elle se trouve. Renvoie True si
+        tout le chemin a été joué.
+        """
+        board = self.board
+        if not board.current_piece:
+            return False
+        
+        for move in path:
+            if move == MOVE_DOWN and fallen > 0:
+                fallen -= 1
+                continue
+            if move == MOVE_ROTATE:
+                moved = board.try_rotate()
+            elif move == MOVE_LEFT:
+                moved = board.try_move(-1, 0)
+            elif move == MOVE_RIGHT:
+                moved = board.try_move(1, 0)
+            else:
+                moved = board.try_move(0, 1)
+            if not moved:
+                board.current_piece.y = board.hard_drop_y()
                 return False
-                
         return True
     
     def _evaluate_position(self, piece):
         """Évalue la qualité d'une position pour la pièce"""
+        return self._evaluate_blocks(piece.get_blocks(), piece.is_special())
+    
+    def _evaluate_placement(self, rotation_data, x, y, is_special, board=None, totals=None):
+        """Évalue une position à partir des caractéristiques maintenues par le plateau
+        
+        Donne exactement le même score que _evaluate_position, mais ne regarde
+        que les lignes et colonnes touchées par la pièce. totals donne, s'il est
+        connu, le nombre de lignes déjà complètes et la hauteur de la pile.
+        """
+        if board is None:
+            board = self.board
+        rows = board.rows
+        row_fill = board.row_fill
+        heights = board.heights
+        width = board.width
+        height = board.height
+        left = x + rotation_data.x_shift
+        top = y + rotation_data.y_shift
+        if totals is None:
+            totals = (row_fill.count(width), max(heights))
+        full_lines, stack_height = totals
+        
+        # 1. Lignes complétées et 4. adjacences, ligne par ligne de la pièce
+        lines_cleared = full_lines
+        adjacencies = board.adjacencies + rotation_data.adjacencies
+        contacts = 0
+        for row, mask in enumerate(rotation_data.row_masks):
+            grid_y = top + row
+            if row_fill[grid_y] + rotation_data.row_counts[row] == width:
+                lines_cleared += 1
+            
+            mask <<= left
+            grid_row = rows[grid_y]
+            contacts += popcount((mask << 1) & grid_row) + popcount((mask >> 1) & grid_row)
+            if grid_y > 0:
+                contacts += popcount(mask & rows[grid_y - 1])
+            if grid_y < height - 1:
+                contacts += popcount(mask & rows[grid_y + 1])
+        adjacencies += 2 * contacts
+        
+        # 2. Hauteur de la pile
+        pile_height = max(stack_height, height - top)
+        
+        # 3. Trous : les cases vides entre l'ancien et le nouveau sommet deviennent
+        # des trous, les blocs posés sous l'ancien sommet en bouchent
+        holes = board.holes
+        for col, col_top in enumerate(rotation_data.top):
+            column_top = height - heights[left + col]
+            holes += max(0, column_top - top - col_top) - rotation_data.column_counts[col]
+        
+        weights = self.weights
+        score = (lines_cleared * weights.lines + pile_height * weights.height +
+                 holes * weights.holes + adjacencies * weights.adjacencies)
+        
+        # 5. Bonus pour les pièces spéciales bien placées
+        if is_special:
+            score += weights.special
+        
+        return score
+    
+    def _evaluate_blocks(self, blocks, is_special, board=None):
+        """Évalue la grille obtenue en ajoutant les blocs donnés"""
+        if board is None:
+            board = self.board
+        
+        width = board.width
+        height = board.height
+        
         # Simuler l'ajout de la pièce à la grille
-        test_grid = [row[:] for row in self.board.grid]
+        test_grid = [row[:] for row in board.grid]
+        weights = self.weights
         score = 0
         
-        for x, y in piece.get_blocks():
-            if 0 <= y < BOARD_HEIGHT and 0 <= x < BOARD_WIDTH:
-                test_grid[y][x] = piece.color
+        for x, y in blocks:
+            if 0 <= y < height and 0 <= x < width:
+                test_grid[y][x] = True
         
         # Critères d'évaluation
         
         # 1. Nombre de lignes complétées
         lines_cleared = 0
-        for y in range(BOARD_HEIGHT):
-            if all(test_grid[y][x] is not None for x in range(BOARD_WIDTH)):
+        for y in range(height):
+            if all(test_grid[y][x] is not None for x in range(width)):
                 lines_cleared += 1
-                score += 100  # Bonus pour chaque ligne complétée
+                score += weights.lines  # Bonus pour chaque ligne complétée
         
         # 2. Hauteur de la pile
         pile_height = 0
-        for y in range(BOARD_HEIGHT):
-            if any(test_grid[y][x] is not None for x in range(BOARD_WIDTH)):
-                pile_height = BOARD_HEIGHT - y
+        for y in range(height):
+            if any(test_grid[y][x] is not None for x in range(width)):
+                pile_height = height - y
                 break
         
-        score -= pile_height * 2  # Pénalité pour la hauteur
+        score += pile_height * weights.height  # Pénalité pour la hauteur
         
         # 3. Nombre de trous (cellules vides avec des blocs au-dessus)
         holes = 0
-        for x in range(BOARD_WIDTH):
+        for x in range(width):
             found_block = False
-            for y in range(BOARD_HEIGHT):
+            for y in range(height):
                 if test_grid[y][x] is not None:
                     found_block = True
                 elif found_block:
                     holes += 1
         
-        score -= holes * 5  # Pénalité importante pour les trous
+        score += holes * weights.holes  # Pénalité importante pour les trous
         
         # 4. Nombre de blocs adjacents (pour favoriser le regroupement)
         adjacencies = 0
-        for y in range(BOARD_HEIGHT):
-            for x in range(BOARD_WIDTH):
+        for y in range(height):
+            for x in range(width):
                 if test_grid[y][x] is not None:
                     # Vérifier les 4 directions
                     for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
                         nx, ny = x + dx, y + dy
-                        if (0 <= nx < BOARD_WIDTH and 0 <= ny < BOARD_HEIGHT and 
+                        if (0 <= nx < width and 0 <= ny < height and 
                             test_grid[ny][nx] is not None):
                             adjacencies += 1
         
-        score += adjacencies  # Bonus pour les blocs adjacents
+        score += adjacencies * weights.adjacencies  # Bonus pour les blocs adjacents
         
         # 5. Bonus pour les pièces spéciales bien placées
-        if piece.is_special():
-            score += 50  # Bonus supplémentaire pour placer une pièce spéciale
+        if is_special:
+            score += weights.special  # Bonus supplémentaire pour placer une pièce spéciale
         
         return score
 
+def hsv_to_rgb(h, s, v):
+    """Convertit une couleur HSV en couleur RGB hexadécimale"""
+    h = h / 360.0
+    
+    if s == 0.0:
+        r = g = b = v
+    else:
+        i = int(h * 6.0)
+        f = (h * 6.0) - i
+        p = v * (1.0 - s)
+        q = v * (1.0 - s * f)
+        t = v * (1.0 - s * (1.0 - f))
+        i = i % 6
+        
+        if i == 0: r, g, b = v, t, p
+        elif i == 1: r, g, b = q, v, p
+        elif i == 2: r, g, b = p, v, t
+        elif i == 3: r, g, b = p, q, v
+        elif i == 4: r, g, b = t, p, v
+        else: r, g, b = v, p, q
+    
+    r, g, b = int(r * 255), int(g * 255), int(b * 255)
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+# Palette arc-en-ciel : une couleur par degré de teinte, calculée une seule fois
+RAINBOW_PALETTE = [hsv_to_rgb(hue, 1.0, 1.0) for hue in range(360)]
+
+# Classe pour l'affichage d'un plateau
+class BoardRenderer:
+    """Affichage en mode retenu : un rectangle par case, créé une seule fois
+    
+    À chaque image, seules les cases dont la couleur a changé depuis l'image
+    précédente sont modifiées sur le canevas.
+    """
+    def __init__(self, canvas, width=BOARD_WIDTH, height=BOARD_HEIGHT, block_size=BLOCK_SIZE):
+        self.canvas = canvas
+        self.cells = [
+            [
+                canvas.create_rectangle(
+                    x * block_size,
+                    y * block_size,
+                    (x + 1) * block_size,
+                    (y + 1) * block_size,
+                    fill=COLORS['EMPTY'],
+                    outline='white',
+                    width=1
+                )
+                for x in range(width)
+            ]
+            for y in range(height)
+        ]
+        # Couleurs affichées à l'image précédente
+        self.colors = [[COLORS['EMPTY']] * width for _ in range(height)]
+    
+    def draw(self, colors):
+        """Affiche une grille de couleurs en ne touchant que les cases modifiées"""
+        for y, row in enumerate(colors):
+            previous_row = self.colors[y]
+            if row == previous_row:
+                continue
+            
+            cells = self.cells[y]
+            for x, color in enumerate(row):
+                if color != previous_row[x]:
+                    self.canvas.itemconfig(cells[x], fill=color)
+            self.colors[y] = row
+
 # Classe principale du jeu Tetris
 class TetrisGame:
-    def __init__(self, root):
+    def __init__(self, root, fps=RENDER_FPS, record_dir=None, weights=None, rules=None,
+                 width=BOARD_WIDTH, height=BOARD_HEIGHT, block_size=BLOCK_SIZE):
         self.root = root
+        # Dimensions des plateaux (en cases) et taille d'une case à l'écran
+        self.board_width = width
+        self.board_height = height
+        self.block_size = block_size
+        # Règles spéciales entre les deux plateaux
+        self.rules = rules if rules is not None else GameRules()
+        # Dossier où enregistrer chaque partie (un journal par plateau), ou None
+        self.record_dir = record_dir
+        self.recorders = []
         self.root.title("Tetris à deux joueurs")
         # Augmenter la marge verticale de 100 à 150 ou 200 pixels
-        self.root.geometry(f"{2*BOARD_WIDTH*BLOCK_SIZE + 300}x{BOARD_HEIGHT*BLOCK_SIZE + 200}")
+        self.root.geometry(f"{2*width*block_size + 300}x{height*block_size + 200}")
         self.root.configure(bg='black')
         self.root.resizable(False, False)
         
+        # Horloge unique pour tous les événements du jeu
+        self.clock = GameClock()
+        
         # Créer les plateaux
-        self.human_board = Board()
-        self.ai_board = Board()
+        self.human_board = self.create_board()
+        self.ai_board = self.create_board()
         
-        # Créer les joueurs
+        # Créer les joueurs ; l'IA cherche dans un thread de travail et
+        # ses coups sont appliqués par la boucle principale
         self.human_player = HumanPlayer(self.human_board)
-        self.ai_player = AIPlayer(self.ai_board)
+        self.ai_executor = ThreadPoolExecutor(max_workers=1)
+        self.ai_player = AIPlayer(self.ai_board, executor=self.ai_executor, weights=weights)
         
         # Configuration de l'interface
         self.setup_ui()
@@ -479,6 +1878,14 @@ class TetrisGame:
         self.rainbow_timer = None
         self.rainbow_end_timer = None
         self.rainbow_counter = 0
+        self.rainbow_started = 0.0  # Instant (temps de jeu) d'activation de l'arc-en-ciel
+        
+        # Affichage regroupé : les parties à redessiner sont notées, puis
+        # dessinées au plus une fois par image
+        self.frame_interval = max(1, int(1000 / fps))
+        self.dirty = set()
+        self.last_render_time = 0.0  # Durée du dernier rendu (secondes)
+        self.frame_loop()
         
         # Lier les touches pour le contrôle du joueur
         self.root.bind("<Left>", lambda e: self.move_human_piece(-1, 0))
@@ -488,10 +1895,15 @@ class TetrisGame:
         self.root.bind("<space>", lambda e: self.drop_human_piece())
         self.root.bind("<p>", lambda e: self.toggle_pause())
         self.root.bind("<r>", lambda e: self.restart_game())
+        self.root.bind("<d>", lambda e: self.toggle_debug())
         
         # Démarrer le jeu
         self.start_game()
     
+    def create_board(self):
+        """Nouveau plateau aux dimensions de la partie"""
+        return Board(clock=self.clock, width=self.board_width, height=self.board_height)
+    
     def setup_ui(self):
         # Cadre principal
         main_frame = tk.Frame(self.root, bg='black')
@@ -512,13 +1924,15 @@ class TetrisGame:
         
         self.human_canvas = tk.Canvas(
             human_frame, 
-            width=BOARD_WIDTH*BLOCK_SIZE, 
-            height=BOARD_HEIGHT*BLOCK_SIZE,
+            width=self.board_width*self.block_size, 
+            height=self.board_height*self.block_size,
             bg='black',
             highlightthickness=1,
             highlightbackground='#555555'
         )
         self.human_canvas.pack()
+        self.human_renderer = BoardRenderer(self.human_canvas, self.board_width,
+                                            self.board_height, self.block_size)
         
         # Section d'informations et contrôles au milieu
         info_frame = tk.Frame(main_frame, bg='black', width=200)
@@ -535,6 +1949,7 @@ class TetrisGame:
         Espace : Tomber
         P : Pause
         R : Recommencer
+        D : Infos IA
         """
         
         controls_info = tk.Label(info_frame, text=controls_text, font=("Arial", 10), bg='black', fg='white', justify=tk.LEFT)
@@ -546,8 +1961,8 @@ class TetrisGame:
         
         self.next_piece_canvas = tk.Canvas(
             info_frame, 
-            width=4*BLOCK_SIZE, 
-            height=4*BLOCK_SIZE,
+            width=4*self.block_size, 
+            height=4*self.block_size,
             bg='black',
             highlightthickness=1,
             highlightbackground='#555555'
@@ -565,6 +1980,14 @@ class TetrisGame:
         self.status_label = tk.Label(info_frame, text="Prêt", font=("Arial", 12), bg='black', fg='white')
         self.status_label.pack(pady=20)
         
+        # Temps de rendu de la dernière image
+        self.render_time_label = tk.Label(info_frame, text="Rendu : -", font=("Arial", 9), bg='black', fg='#777777')
+        self.render_time_label.pack()
+        
+        # Profil de la dernière décision de l'IA (touche D)
+        self.debug_label = tk.Label(info_frame, text="", font=("Courier", 9), bg='black', fg='#777777', justify=tk.LEFT)
+        self.debug_label.pack(pady=5)
+        
         # Cadre pour l'IA
         ai_frame = tk.Frame(main_frame, bg='#111111', bd=2, relief=tk.RAISED)
         ai_frame.pack(side=tk.RIGHT, padx=5)
@@ -580,19 +2003,22 @@ class TetrisGame:
         
         self.ai_canvas = tk.Canvas(
             ai_frame, 
-            width=BOARD_WIDTH*BLOCK_SIZE, 
-            height=BOARD_HEIGHT*BLOCK_SIZE,
+            width=self.board_width*self.block_size, 
+            height=self.board_height*self.block_size,
             bg='black',
             highlightthickness=1,
             highlightbackground='#555555'
         )
         self.ai_canvas.pack()
+        self.ai_renderer = BoardRenderer(self.ai_canvas, self.board_width,
+                                         self.board_height, self.block_size)
     
     def start_game(self):
         """Démarre une nouvelle partie"""
         # Initialisation des plateaux
-        self.human_board = Board()
-        self.ai_board = Board()
+        self.human_board = self.create_board()
+        self.ai_board = self.create_board()
+        self.start_recording()
         
         # Mise à jour des joueurs
         self.human_player.board = self.human_board
@@ -603,12 +2029,10 @@ class TetrisGame:
         self.ai_board.new_piece()
         
         # Mise à jour des affichages
-        self.update_human_board()
-        self.update_ai_board()
-        self.update_next_piece()
-        self.update_score_display()
+        self.request_render('human', 'ai', 'next', 'score')
         
-        # Démarrage des timers
+        # Démarrage des timers (l'horloge a pu rester en pause)
+        self.clock.resume()
         self.game_running = True
         self.start_fall_timer()
         self.start_ai_timer()
@@ -616,6 +2040,25 @@ class TetrisGame:
         
         self.status_label.config(text="Jeu en cours")
     
+    def start_recording(self):
+        """Ouvre un journal par plateau si l'enregistrement est demandé"""
+        self.stop_recording()
+        if self.record_dir is None:
+            return
+        
+        os.makedirs(self.record_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.recorders = [
+            GameRecorder.attach(self.human_board, os.path.join(self.record_dir, f"{stamp}-joueur.ttr")),
+            GameRecorder.attach(self.ai_board, os.path.join(self.record_dir, f"{stamp}-ia.ttr")),
+        ]
+    
+    def stop_recording(self):
+        """Ferme les journaux de la partie en cours"""
+        for recorder in self.recorders:
+            recorder.close()
+        self.recorders = []
+    
     def restart_game(self):
         """Redémarre le jeu"""
         # Annuler tous les timers
@@ -627,49 +2070,38 @@ class TetrisGame:
     def toggle_pause(self):
         """Met le jeu en pause ou le reprend"""
         if self.game_running:
+            # L'horloge s'arrête : tous les événements gardent leur délai restant
             self.game_running = False
-            self.cancel_timers()
+            self.clock.pause()
             self.status_label.config(text="Pause")
             self.pause_button.config(text="Reprendre (P)")
         else:
             self.game_running = True
-            self.start_fall_timer()
-            self.start_ai_timer()
-            self.start_rainbow_timer()
+            self.clock.resume()
             self.status_label.config(text="Jeu en cours")
             self.pause_button.config(text="Pause (P)")
     
     def cancel_timers(self):
         """Annule tous les timers du jeu"""
-        if self.fall_timer:
-            self.root.after_cancel(self.fall_timer)
-            self.fall_timer = None
-            
-        if self.ai_timer:
-            self.root.after_cancel(self.ai_timer)
-            self.ai_timer = None
-            
-        if self.rainbow_timer:
-            self.root.after_cancel(self.rainbow_timer)
-            self.rainbow_timer = None
-            
-        if self.rainbow_end_timer:
-            self.root.after_cancel(self.rainbow_end_timer)
-            self.rainbow_end_timer = None
+        self.clock.clear()
+        self.fall_timer = None
+        self.ai_timer = None
+        self.rainbow_timer = None
+        self.rainbow_end_timer = None
     
     def start_fall_timer(self):
         """Démarre le timer pour la chute des pièces"""
         if not self.game_running:
             return
             
-        self.fall_timer = self.root.after(int(self.human_board.fall_speed * 1000), self.piece_fall)
+        self.fall_timer = self.clock.schedule(self.human_board.fall_speed, self.piece_fall)
     
     def start_ai_timer(self):
         """Démarre le timer pour les mouvements de l'IA"""
         if not self.game_running:
             return
             
-        self.ai_timer = self.root.after(int(self.ai_board.fall_speed * 1000), self.ai_play)
+        self.ai_timer = self.clock.schedule(self.ai_board.fall_speed, self.ai_play)
     
     def start_rainbow_timer(self):
         """Démarre le timer pour l'effet arc-en-ciel"""
@@ -677,20 +2109,21 @@ class TetrisGame:
             return
             
         # L'effet arc-en-ciel se déclenche toutes les 2 minutes
-        self.rainbow_timer = self.root.after(RAINBOW_INTERVAL * 1000, self.activate_rainbow)
+        self.rainbow_timer = self.clock.schedule(RAINBOW_INTERVAL, self.activate_rainbow)
     
     def activate_rainbow(self):
         """Active l'effet arc-en-ciel"""
         self.human_board.toggle_rainbow_mode(True)
         self.ai_board.toggle_rainbow_mode(True)
+        self.rainbow_started = self.clock.now()
+        self.rainbow_counter = 0
         self.status_label.config(text="Mode Arc-en-ciel!")
         
         # Mettre à jour les affichages
-        self.update_human_board()
-        self.update_ai_board()
+        self.request_render('human', 'ai')
         
         # Timer pour désactiver l'effet après 20 secondes
-        self.rainbow_end_timer = self.root.after(RAINBOW_DURATION * 1000, self.deactivate_rainbow)
+        self.rainbow_end_timer = self.clock.schedule(RAINBOW_DURATION, self.deactivate_rainbow)
     
     def deactivate_rainbow(self):
         """Désactive l'effet arc-en-ciel"""
@@ -699,8 +2132,7 @@ class TetrisGame:
         self.status_label.config(text="Jeu en cours")
         
         # Mettre à jour les affichages
-        self.update_human_board()
-        self.update_ai_board()
+        self.request_render('human', 'ai')
         
         # Redémarrer le timer arc-en-ciel
         self.start_rainbow_timer()
@@ -714,28 +2146,16 @@ class TetrisGame:
         if not self.human_board.try_move(0, 1):
             # La pièce ne peut plus descendre, on la verrouille
             lines_cleared = self.human_board.lock_piece()
-            
-            # Vérifier les règles spéciales
-            if lines_cleared == 2:
-                # Cadeau surprise: l'adversaire reçoit une pièce facile
-                self.ai_board.next_piece = Piece(random.choice(self.ai_board.easy_piece_types))
-            
-            # Vérifier si le score a atteint un multiple de 1000
-            if self.human_board.score // 1000 > (self.human_board.score - lines_cleared * 50) // 1000:
-                # Ralentir les deux joueurs
-                self.human_board.apply_slowdown()
-                self.ai_board.apply_slowdown()
-                self.status_label.config(text="Ralentissement!")
+            self.apply_rules(self.human_board, lines_cleared)
             
             # Créer une nouvelle pièce
             if not self.human_board.new_piece():
                 self.game_over("L'IA a gagné!")
                 return
                 
-            self.update_next_piece()
+            self.request_render('next')
             
-        self.update_human_board()
-        self.update_score_display()
+        self.request_render('human', 'score')
         
         # Vérifier si le jeu est terminé
         if self.human_board.game_over:
@@ -758,26 +2178,14 @@ class TetrisGame:
         if not self.ai_board.try_move(0, 1):
             # La pièce ne peut plus descendre, on la verrouille
             lines_cleared = self.ai_board.lock_piece()
-            
-            # Vérifier les règles spéciales
-            if lines_cleared == 2:
-                # Cadeau surprise: l'adversaire reçoit une pièce facile
-                self.human_board.next_piece = Piece(random.choice(self.human_board.easy_piece_types))
-            
-            # Vérifier si le score a atteint un multiple de 1000
-            if self.ai_board.score // 1000 > (self.ai_board.score - lines_cleared * 50) // 1000:
-                # Ralentir les deux joueurs
-                self.human_board.apply_slowdown()
-                self.ai_board.apply_slowdown()
-                self.status_label.config(text="Ralentissement!")
+            self.apply_rules(self.ai_board, lines_cleared)
             
             # Créer une nouvelle pièce
             if not self.ai_board.new_piece():
                 self.game_over("Vous avez gagné!")
                 return
         
-        self.update_ai_board()
-        self.update_score_display()
+        self.request_render('ai', 'score')
         
         # Vérifier si le jeu est terminé
         if self.ai_board.game_over:
@@ -787,92 +2195,134 @@ class TetrisGame:
         # Relancer le timer
         self.start_ai_timer()
     
-    def update_human_board(self):
-        """Met à jour l'affichage du plateau du joueur humain"""
-        self.human_canvas.delete("all")
+    def apply_rules(self, board, lines_cleared):
+        """Vérifie les règles spéciales après une pièce verrouillée sur board"""
+        if self.rules.on_lock(board, lines_cleared, [self.human_board, self.ai_board]):
+            self.status_label.config(text="Ralentissement!")
+    
+    def request_render(self, *parts):
+        """Demande le rendu de parties de l'affichage ('human', 'ai', 'next', 'score')"""
+        self.dirty.update(parts)
+    
+    def frame_loop(self):
+        """Boucle principale : exécute les événements dus, puis dessine une image"""
+        self.clock.run_due()
+        if self.game_running and self.ai_player.apply_decisions():
+            self.request_render('ai', 'debug')
+        self.update_rainbow_counter()
+        self.render_frame()
+        self.root.after(self.frame_interval, self.frame_loop)
+    
+    def render_frame(self):
+        """Dessine immédiatement les parties en attente et mesure le temps de rendu"""
+        if not self.dirty:
+            return
         
-        # Dessiner la grille
-        for y in range(BOARD_HEIGHT):
-            for x in range(BOARD_WIDTH):
-                color = self.human_board.grid[y][x] if self.human_board.grid[y][x] else COLORS['EMPTY']
-                
-                # Effet arc-en-ciel
-                if self.human_board.rainbow_mode and self.human_board.grid[y][x]:
-                    hue = (self.rainbow_counter + x + y) % 360
-                    color = self._hsv_to_rgb(hue, 1.0, 1.0)
-                    
-                self.draw_block(self.human_canvas, x, y, color)
+        start = time.perf_counter()
+        dirty, self.dirty = self.dirty, set()
         
-        # Dessiner la pièce courante
-        if self.human_board.current_piece:
-            for x, y in self.human_board.current_piece.get_blocks():
-                if 0 <= y < BOARD_HEIGHT and 0 <= x < BOARD_WIDTH:
-                    color = self.human_board.current_piece.color
-                    
-                    # Effet arc-en-ciel
-                    if self.human_board.rainbow_mode:
-                        hue = (self.rainbow_counter + x + y) % 360
-                        color = self._hsv_to_rgb(hue, 1.0, 1.0)
-                        
-                    self.draw_block(self.human_canvas, x, y, color)
+        if 'human' in dirty:
+            self.update_human_board()
+        if 'ai' in dirty:
+            self.update_ai_board()
+        if 'next' in dirty:
+            self.update_next_piece()
+        if 'score' in dirty:
+            self.update_score_display()
+        if 'debug' in dirty:
+            self.update_debug_overlay()
+        
+        self.last_render_time = time.perf_counter() - start
+        self.render_time_label.config(text=f"Rendu : {self.last_render_time * 1000:.1f} ms")
+    
+    def toggle_debug(self):
+        """Affiche ou masque le profil des décisions de l'IA"""
+        self.ai_player.profile = not self.ai_player.profile
+        self.request_render('debug')
+    
+    def update_debug_overlay(self):
+        """Affiche le profil de la dernière décision de l'IA"""
+        if not self.ai_player.profile:
+            self.debug_label.config(text="")
+            return
+        
+        history = self.ai_player.history
+        if not history:
+            self.debug_label.config(text="IA : en attente")
+            return
+        
+        decision = history[-1]
+        self.debug_label.config(text=(
+            f"IA : {decision.candidates} positions\n"
+            f"génération {decision.generation_time * 1000:.2f} ms\n"
+            f"évaluation {decision.evaluation_time * 1000:.2f} ms\n"
+            f"choix {decision.shape} r{decision.rotation} x{decision.x}\n"
+            f"score {decision.score} (+{decision.margin})"
+        ))
+    
+    def update_rainbow_counter(self):
+        """Fait défiler les couleurs arc-en-ciel selon le temps écoulé"""
+        if not (self.human_board.rainbow_mode or self.ai_board.rainbow_mode):
+            return
+        
+        counter = int((self.clock.now() - self.rainbow_started) * RAINBOW_SPEED) % 360
+        if counter != self.rainbow_counter:
+            self.rainbow_counter = counter
+            self.request_render('human', 'ai')
+    
+    def update_human_board(self):
+        """Met à jour l'affichage du plateau du joueur humain"""
+        self.human_renderer.draw(self._board_colors(self.human_board))
     
     def update_ai_board(self):
         """Met à jour l'affichage du plateau de l'IA"""
-        self.ai_canvas.delete("all")
-        
-        # Dessiner la grille
-        for y in range(BOARD_HEIGHT):
-            for x in range(BOARD_WIDTH):
-                color = self.ai_board.grid[y][x] if self.ai_board.grid[y][x] else COLORS['EMPTY']
-                
-                # Effet arc-en-ciel
-                if self.ai_board.rainbow_mode and self.ai_board.grid[y][x]:
-                    hue = (self.rainbow_counter + x + y) % 360
-                    color = self._hsv_to_rgb(hue, 1.0, 1.0)
-                    
-                self.draw_block(self.ai_canvas, x, y, color)
+        self.ai_renderer.draw(self._board_colors(self.ai_board))
+    
+    def _board_colors(self, board):
+        """Calcule la couleur de chaque case d'un plateau, pièce courante comprise"""
+        colors = [[color if color else COLORS['EMPTY'] for color in row] for row in board.grid]
+        
+        # Effet arc-en-ciel
+        if board.rainbow_mode:
+            counter = self.rainbow_counter
+            for y, row in enumerate(board.grid):
+                for x, color in enumerate(row):
+                    if color:
+                        colors[y][x] = RAINBOW_PALETTE[(counter + x + y) % 360]
         
         # Dessiner la pièce courante
-        if self.ai_board.current_piece:
-            for x, y in self.ai_board.current_piece.get_blocks():
-                if 0 <= y < BOARD_HEIGHT and 0 <= x < BOARD_WIDTH:
-                    color = self.ai_board.current_piece.color
+        if board.current_piece:
+            for x, y in board.current_piece.get_blocks():
+                if 0 <= y < board.height and 0 <= x < board.width:
+                    color = board.current_piece.color
                     
                     # Effet arc-en-ciel
-                    if self.ai_board.rainbow_mode:
-                        hue = (self.rainbow_counter + x + y) % 360
-                        color = self._hsv_to_rgb(hue, 1.0, 1.0)
-                        
-                    self.draw_block(self.ai_canvas, x, y, color)
+                    if board.rainbow_mode:
+                        color = RAINBOW_PALETTE[(self.rainbow_counter + x + y) % 360]
+                    
+                    colors[y][x] = color
+        
+        return colors
     
     def update_next_piece(self):
         """Met à jour l'affichage de la prochaine pièce"""
         self.next_piece_canvas.delete("all")
         
         if self.human_board.next_piece:
-            # Obtenir les coordonnées de la forme
-            shape = SHAPES[self.human_board.next_piece.shape_name][0]
-            
-            # Trouver les dimensions de la pièce
-            min_x = min(x for x, _ in shape)
-            max_x = max(x for x, _ in shape)
-            min_y = min(y for _, y in shape)
-            max_y = max(y for _, y in shape)
-            
-            width = max_x - min_x + 1
-            height = max_y - min_y + 1
+            # Obtenir la forme précalculée (rotation initiale)
+            rotation_data = PIECE_TABLE[self.human_board.next_piece.shape_name][0]
             
             # Calculer le décalage pour centrer la pièce
-            offset_x = (4 - width) // 2
-            offset_y = (4 - height) // 2
+            offset_x = (4 - rotation_data.width) // 2
+            offset_y = (4 - rotation_data.height) // 2
             
             # Dessiner la pièce
-            for x, y in shape:
+            for x, y in rotation_data.blocks:
                 self.next_piece_canvas.create_rectangle(
-                    (x - min_x + offset_x) * BLOCK_SIZE,
-                    (y - min_y + offset_y) * BLOCK_SIZE,
-                    (x - min_x + offset_x + 1) * BLOCK_SIZE,
-                    (y - min_y + offset_y + 1) * BLOCK_SIZE,
+                    (x + offset_x) * self.block_size,
+                    (y + offset_y) * self.block_size,
+                    (x + offset_x + 1) * self.block_size,
+                    (y + offset_y + 1) * self.block_size,
                     fill=self.human_board.next_piece.color,
                     outline='white',
                     width=1
@@ -885,22 +2335,6 @@ class TetrisGame:
         
         self.ai_score_label.config(text=f"Score: {self.ai_board.score}")
         self.ai_level_label.config(text=f"Niveau: {self.ai_board.level}")
-        
-        # Mettre à jour le compteur arc-en-ciel
-        if self.human_board.rainbow_mode or self.ai_board.rainbow_mode:
-            self.rainbow_counter = (self.rainbow_counter + 5) % 360
-    
-    def draw_block(self, canvas, x, y, color):
-        """Dessine un bloc à la position spécifiée"""
-        canvas.create_rectangle(
-            x * BLOCK_SIZE,
-            y * BLOCK_SIZE,
-            (x + 1) * BLOCK_SIZE,
-            (y + 1) * BLOCK_SIZE,
-            fill=color,
-            outline='white',
-            width=1
-        )
     
     def move_human_piece(self, dx, dy):
         """Déplace la pièce du joueur humain"""
@@ -908,7 +2342,7 @@ class TetrisGame:
             return
             
         if self.human_board.try_move(dx, dy):
-            self.update_human_board()
+            self.request_render('human')
     
     def rotate_human_piece(self):
         """Fait tourner la pièce du joueur humain"""
@@ -916,7 +2350,7 @@ class TetrisGame:
             return
             
         if self.human_board.try_rotate():
-            self.update_human_board()
+            self.request_render('human')
     
     def drop_human_piece(self):
         """Fait tomber la pièce du joueur humain jusqu'en bas"""
@@ -924,69 +2358,48 @@ class TetrisGame:
             return
             
         # Déplacer la pièce vers le bas jusqu'à ce qu'elle ne puisse plus descendre
-        while self.human_board.try_move(0, 1):
-            pass
+        self.human_board.current_piece.y = self.human_board.hard_drop_y()
             
         # Verrouiller la pièce
         lines_cleared = self.human_board.lock_piece()
-        
-        # Vérifier les règles spéciales
-        if lines_cleared == 2:
-            # Cadeau surprise: l'adversaire reçoit une pièce facile
-            self.ai_board.next_piece = Piece(random.choice(self.ai_board.easy_piece_types))
-        
-        # Vérifier si le score a atteint un multiple de 1000
-        if self.human_board.score // 1000 > (self.human_board.score - lines_cleared * 50) // 1000:
-            # Ralentir les deux joueurs
-            self.human_board.apply_slowdown()
-            self.ai_board.apply_slowdown()
-            self.status_label.config(text="Ralentissement!")
+        self.apply_rules(self.human_board, lines_cleared)
         
         # Créer une nouvelle pièce
         if not self.human_board.new_piece():
             self.game_over("L'IA a gagné!")
             return
             
-        self.update_human_board()
-        self.update_next_piece()
-        self.update_score_display()
+        self.request_render('human', 'next', 'score')
     
     def game_over(self, message):
         """Affiche un message de fin de jeu et arrête la partie"""
         self.game_running = False
         self.cancel_timers()
+        self.stop_recording()
         
         self.status_label.config(text="Game Over")
         
+        # Afficher l'état final avant le message
+        self.render_frame()
+        
         # Afficher le message de fin de jeu
         messagebox.showinfo("Game Over", f"{message}\n\nJoueur: {self.human_board.score} points\nIA: {self.ai_board.score} points")
-    
-    def _hsv_to_rgb(self, h, s, v):
-        """Convertit une couleur HSV en couleur RGB hexadécimale"""
-        h = h / 360.0
-        
-        if s == 0.0:
-            r = g = b = v
-        else:
-            i = int(h * 6.0)
-            f = (h * 6.0) - i
-            p = v * (1.0 - s)
-            q = v * (1.0 - s * f)
-            t = v * (1.0 - s * (1.0 - f))
-            i = i % 6
-            
-            if i == 0: r, g, b = v, t, p
-            elif i == 1: r, g, b = q, v, p
-            elif i == 2: r, g, b = p, v, t
-            elif i == 3: r, g, b = p, q, v
-            elif i == 4: r, g, b = t, p, v
-            else: r, g, b = v, p, q
-        
-        r, g, b = int(r * 255), int(g * 255), int(b * 255)
-        return f'#{r:02x}{g:02x}{b:02x}'
 
 # Point d'entrée principal
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tetris à deux joueurs contre l'IA")
+    parser.add_argument('--record', metavar='DOSSIER', default=None,
+                        help="enregistrer chaque partie dans ce dossier (voir replay.py)")
+    parser.add_argument('--weights', metavar='FICHIER', default=None,
+                        help="poids d'évaluation de l'IA (produits par tune.py)")
+    parser.add_argument('--width', type=int, default=BOARD_WIDTH, help="largeur des plateaux (cases)")
+    parser.add_argument('--height', type=int, default=BOARD_HEIGHT, help="hauteur des plateaux (cases)")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help="taille d'une case à l'écran (pixels)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    game = TetrisGame(root)
+    weights = load_weights(args.weights) if args.weights else None
+    game = TetrisGame(root, record_dir=args.record, weights=weights, width=args.width,
+                      height=args.height, block_size=args.block_size)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""Relecture des parties enregistrées
+
+Un journal (écrit par main.GameRecorder) contient la suite des pièces, la
+position et l'instant de chaque pièce verrouillée et les événements spéciaux
+(pièces offertes, ralentissements, arc-en-ciel). La relecture reconstruit le
+plateau sans refaire la recherche de l'IA : soit d'un coup et sans interface,
+soit au rythme de la partie sur des canevas Tkinter.
+"""
+import time
+import argparse
+from collections import namedtuple
+
+from main import (
+    tk,
+    Board,
+    Piece,
+    BoardRenderer,
+    SimulatedClock,
+    RANDOMIZERS,
+    RAINBOW_PALETTE,
+    RAINBOW_SPEED,
+    COLORS,
+    BLOCK_SIZE,
+    LOG_MAGIC,
+    LOG_VERSION,
+    LOG_HEADER,
+    LOG_EVENT,
+    SHAPE_CODES,
+    EVENT_PIECE,
+    EVENT_CURRENT,
+    EVENT_LOCK,
+    EVENT_GIFT,
+    EVENT_SLOWDOWN,
+    EVENT_RAINBOW,
+)
+
+# En-tête d'un journal (seed = None si la partie n'avait pas de graine)
+LogHeader = namedtuple('LogHeader', ['seed', 'randomizer', 'width', 'height'])
+
+
+def read_log(path):
+    """Lit un journal et renvoie son en-tête et la liste de ses événements
+
+    Chaque événement est un tuple (type, valeur, x, y, instant en ms). Un
+    dernier enregistrement incomplet (partie interrompue) est ignoré.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    magic, version, randomizer, width, height, seed = LOG_HEADER.unpack_from(data)
+    if magic != LOG_MAGIC or version != LOG_VERSION:
+        raise ValueError(f"{path} n'est pas un journal de partie (version {LOG_VERSION})")
+
+    body = data[LOG_HEADER.size:]
+    body = body[:len(body) - len(body) % LOG_EVENT.size]
+    header = LogHeader(None if seed < 0 else seed, RANDOMIZERS[randomizer], width, height)
+    return header, list(LOG_EVENT.iter_unpack(body))
+
+
+class Replayer:
+    """Reconstruit un plateau en rejouant les événements de son journal"""
+
+    def __init__(self, path, clock=None):
+        self.path = path
+        self.header, self.events = read_log(path)
+        # Plateau aux dimensions enregistrées dans le journal
+        self.board = Board(clock=clock if clock is not None else SimulatedClock(),
+                           width=self.header.width, height=self.header.height)
+        self.index = 0
+        self.pieces = 0
+        self.lines = 0
+
+    def is_over(self):
+        return self.index >= len(self.events)
+
+    def next_time(self):
+        """Instant (temps de jeu, secondes) du prochain événement, ou None"""
+        if self.is_over():
+            return None
+        return self.events[self.index][4] / 1000
+
+    def step(self):
+        """Applique l'événement suivant au plateau et renvoie son type"""
+        kind, value, x, y, _ = self.events[self.index]
+        self.index += 1
+        board = self.board
+
+        if kind == EVENT_PIECE:
+            # Même enchaînement que Board.new_piece : la pièce suivante devient courante
+            board.current_piece = board.next_piece
+            board.next_piece = Piece(SHAPE_CODES[value], board.width)
+            if board.current_piece is not None and not board.is_valid_position():
+                board.game_over = True
+        elif kind == EVENT_CURRENT:
+            board.current_piece = Piece(SHAPE_CODES[value], board.width)
+            if not board.is_valid_position():
+                board.game_over = True
+        elif kind == EVENT_LOCK:
+            piece = board.current_piece
+            piece.rotation, piece.x, piece.y = value, x, y
+            self.lines += board.lock_piece()
+            self.pieces += 1
+        elif kind == EVENT_GIFT:
+            board.next_piece = Piece(SHAPE_CODES[value], board.width)
+        elif kind == EVENT_SLOWDOWN:
+            board.apply_slowdown()
+        elif kind == EVENT_RAINBOW:
+            board.toggle_rainbow_mode(bool(value))
+        else:
+            raise ValueError(f"{self.path} : événement inconnu {kind}")
+
+        return kind
+
+    def advance_to(self, game_time):
+        """Applique tous les événements survenus avant l'instant game_time
+
+        Renvoie True si le plateau a changé.
+        """
+        changed = False
+        limit = game_time * 1000
+        while not self.is_over() and self.events[self.index][4] <= limit:
+            self.step()
+            changed = True
+        return changed
+
+    def run(self):
+        """Rejoue tout le journal aussi vite que possible et renvoie le plateau"""
+        while not self.is_over():
+            self.step()
+        return self.board
+
+    def results(self):
+        """Résultats du plateau rejoué, comme HeadlessGame.results"""
+        return {
+            'score': self.board.score,
+            'lines': self.lines,
+            'pieces': self.pieces,
+            'duration': self.events[-1][4] / 1000 if self.events else 0.0,
+        }
+
+
+def board_colors(board, rainbow_counter=0):
+    """Couleur de chaque case d'un plateau rejoué, pièce courante comprise"""
+    colors = [[color if color else COLORS['EMPTY'] for color in row] for row in board.grid]
+    if board.current_piece and not board.game_over:
+        for x, y in board.current_piece.get_blocks():
+            if 0 <= y < board.height and 0 <= x < board.width:
+                colors[y][x] = board.current_piece.color
+
+    if board.rainbow_mode:
+        for y, row in enumerate(colors):
+            for x, color in enumerate(row):
+                if color != COLORS['EMPTY']:
+                    row[x] = RAINBOW_PALETTE[(rainbow_counter + x + y) % 360]
+    return colors
+
+
+class ReplayViewer:
+    """Affiche des parties enregistrées côte à côte, au rythme où elles ont été jouées"""
+
+    def __init__(self, root, paths, speed=1.0, fps=60, block_size=BLOCK_SIZE):
+        self.root = root
+        self.root.title("Relecture Tetris")
+        self.root.configure(bg='black')
+        self.speed = speed
+        self.frame_interval = max(1, int(1000 / fps))
+        self.replayers = [Replayer(path) for path in paths]
+
+        frame = tk.Frame(root, bg='black')
+        frame.pack(padx=10, pady=10)
+        self.renderers = []
+        self.score_labels = []
+        for replayer in self.replayers:
+            board_frame = tk.Frame(frame, bg='#111111', bd=2, relief=tk.RAISED)
+            board_frame.pack(side=tk.LEFT, padx=5)
+
+            score_label = tk.Label(board_frame, text="Score: 0", font=("Arial", 12), bg='#111111', fg='white')
+            score_label.pack(pady=5)
+            self.score_labels.append(score_label)
+
+            board = replayer.board
+            canvas = tk.Canvas(
+                board_frame,
+                width=board.width*block_size,
+                height=board.height*block_size,
+                bg='black',
+                highlightthickness=1,
+                highlightbackground='#555555'
+            )
+            canvas.pack()
+            self.renderers.append(BoardRenderer(canvas, board.width, board.height, block_size))
+
+        self.start = time.monotonic()
+        self.frame_loop()
+
+    def frame_loop(self):
+        """Applique les événements dus et redessine les plateaux modifiés"""
+        game_time = (time.monotonic() - self.start) * self.speed
+        rainbow_counter = int(game_time * RAINBOW_SPEED) % 360
+
+        for replayer, renderer, label in zip(self.replayers, self.renderers, self.score_labels):
+            if replayer.advance_to(game_time) or replayer.board.rainbow_mode:
+                renderer.draw(board_colors(replayer.board, rainbow_counter))
+                label.config(text=f"Score: {replayer.board.score}")
+
+        if not all(replayer.is_over() for replayer in self.replayers):
+            self.root.after(self.frame_interval, self.frame_loop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relecture de parties enregistrées")
+    parser.add_argument('logs', nargs='+', help="journaux de partie (.ttr)")
+    parser.add_argument('--gui', action='store_true',
+                        help="afficher la relecture au rythme de la partie")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="vitesse de la relecture affichée (2 = deux fois plus vite)")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help="taille d'une case à l'écran (pixels)")
+    args = parser.parse_args()
+
+    if args.gui:
+        root = tk.Tk()
+        ReplayViewer(root, args.logs, speed=args.speed, block_size=args.block_size)
+        root.mainloop()
+        return
+
+    for path in args.logs:
+        replayer = Replayer(path)
+        start = time.perf_counter()
+        replayer.run()
+        elapsed = time.perf_counter() - start
+        result = replayer.results()
+        print(f"{path} : score {result['score']}, {result['lines']} lignes, "
+              f"{result['pieces']} pièces, {result['duration']:.1f} s de jeu "
+              f"rejouées en {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Tests d'équivalence de l'évaluation des positions de l'IA
+
+L'évaluation incrémentale (_evaluate_placement), qui ne regarde que les
+lignes et colonnes touchées par la pièce, doit donner exactement le score de
+l'évaluation complète de la grille (_evaluate_blocks). Le moteur NumPy
+(_candidates_numpy) doit donner les mêmes scores que _candidates.
+
+Lancement : python -m unittest -v
+"""
+
+import random
+import unittest
+
+from main import AIPlayer, Board, MoveSearch, PIECE_TABLE, COLORS, np
+
+
+def random_board(rng, width=10, height=20):
+    """Plateau aléatoire construit bloc par bloc, lignes complètes effacées
+
+    La pile occupe au plus la moitié basse du plateau pour que les pièces
+    puissent toujours apparaître.
+    """
+    board = Board(width=width, height=height)
+    top = height - rng.randrange(height // 2 + 1)
+    for y in range(top, height):
+        density = rng.random()
+        for x in range(width):
+            if rng.random() < density:
+                board.add_block(x, y, COLORS['BORDER'])
+    board.clear_lines()
+    return board
+
+
+def placements(board, shape_name):
+    """Positions de verrouillage atteignables depuis le haut du plateau"""
+    spawn_x = board.width // 2 - 1
+    return MoveSearch(board, shape_name, 0, spawn_x, 0).placements(0)
+
+
+def placement_blocks(rotation_data, x, y):
+    """Cases occupées par une pièce posée en (x, y)"""
+    left = x + rotation_data.x_shift
+    top = y + rotation_data.y_shift
+    return [(left + bx, top + by) for bx, by in rotation_data.blocks]
+
+
+class EvaluatePlacementTest(unittest.TestCase):
+    def check_boards(self, width, height, seed, count):
+        rng = random.Random(seed)
+        for _ in range(count):
+            board = random_board(rng, width, height)
+            ai = AIPlayer(board)
+            for shape_name, rotations in PIECE_TABLE.items():
+                is_special = shape_name in board.special_piece_types
+                for _, rotation_index, x, y in placements(board, shape_name):
+                    rotation_data = rotations[rotation_index]
+                    expected = ai._evaluate_blocks(placement_blocks(rotation_data, x, y), is_special)
+                    with self.subTest(shape=shape_name, rotation=rotation_index, x=x, y=y):
+                        self.assertEqual(ai._evaluate_placement(rotation_data, x, y, is_special),
+                                         expected)
+
+    def test_default_board(self):
+        self.check_boards(10, 20, seed=1, count=150)
+
+    def test_other_sizes(self):
+        self.check_boards(7, 15, seed=2, count=50)
+        # Plus de 64 colonnes : les masques de ligne dépassent un mot machine
+        self.check_boards(70, 30, seed=3, count=2)
+
+
+@unittest.skipIf(np is None, "NumPy n'est pas installé")
+class CandidatesNumpyTest(unittest.TestCase):
+    def check_boards(self, width, height, seed, count):
+        rng = random.Random(seed)
+        for _ in range(count):
+            board = random_board(rng, width, height)
+            ai = AIPlayer(board)
+            for shape_name in PIECE_TABLE:
+                positions = placements(board, shape_name)
+                expected = ai._candidates(board, shape_name, positions)
+                actual = ai._candidates_numpy(board, shape_name, positions)
+                with self.subTest(shape=shape_name):
+                    self.assertEqual(len(actual), len(expected))
+                    for (score, *position), (expected_score, *expected_position) in zip(actual, expected):
+                        self.assertEqual(position, expected_position)
+                        self.assertAlmostEqual(score, expected_score)
+
+    def test_default_board(self):
+        self.check_boards(10, 20, seed=4, count=150)
+
+    def test_other_sizes(self):
+        self.check_boards(7, 15, seed=5, count=50)
+        # Plus de 64 colonnes : les lignes sont dépaquetées octet par octet
+        self.check_boards(70, 30, seed=6, count=20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests de la recherche des positions atteignables (MoveSearch)
+
+Les positions de verrouillage trouvées, chutes libres comprises, doivent être
+exactement celles d'un parcours en largeur naïf fait avec les vrais
+déplacements du plateau (Board.try_move, Board.try_rotate). Chaque chemin
+renvoyé, rejoué sur le plateau, doit mener la pièce sur sa position.
+
+Lancement : python -m unittest -v
+"""
+
+import random
+import unittest
+from collections import deque
+
+from main import (Board, Piece, MoveSearch, PIECE_TABLE, COLORS, MOVE_LEFT, MOVE_RIGHT,
+                  MOVE_DOWN, MOVE_ROTATE)
+from test_evaluation import placement_blocks
+
+
+def random_stack(rng, width=10, height=20):
+    """Plateau aléatoire avec des trous et des surplombs, de hauteur quelconque
+
+    Les piles hautes obligent la recherche à tout parcourir état par état ;
+    les basses passent par les chutes libres.
+    """
+    board = Board(width=width, height=height)
+    top = rng.randrange(2, height + 1)
+    for y in range(top, height):
+        density = rng.random()
+        for x in range(width):
+            if rng.random() < density:
+                board.add_block(x, y, COLORS['BORDER'])
+    board.clear_lines()
+    return board
+
+
+def piece_at(shape_name, rotation, x, y):
+    piece = Piece(shape_name)
+    piece.rotation, piece.x, piece.y = rotation, x, y
+    return piece
+
+
+def brute_force_locks(board, shape_name, start):
+    """Cases des positions de verrouillage atteintes avec les déplacements du plateau"""
+    moves = [lambda: board.try_move(-1, 0), lambda: board.try_move(1, 0),
+             lambda: board.try_move(0, 1), board.try_rotate]
+    locks = set()
+    seen = {start}
+    pending = deque([start])
+    while pending:
+        state = pending.popleft()
+        for move in moves:
+            board.current_piece = piece_at(shape_name, *state)
+            if move():
+                piece = board.current_piece
+                target = (piece.rotation, piece.x, piece.y)
+                if target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        board.current_piece = piece_at(shape_name, *state)
+        if not board.try_move(0, 1):
+            locks.add(frozenset(board.current_piece.get_blocks()))
+    return locks
+
+
+def replay(board, shape_name, start, path):
+    """Joue un chemin sur le plateau ; renvoie la pièce, ou None si une entrée échoue"""
+    board.current_piece = piece_at(shape_name, *start)
+    for move in path:
+        if move == MOVE_ROTATE:
+            moved = board.try_rotate()
+        elif move == MOVE_LEFT:
+            moved = board.try_move(-1, 0)
+        elif move == MOVE_RIGHT:
+            moved = board.try_move(1, 0)
+        else:
+            moved = board.try_move(0, 1)
+        if not moved:
+            return None
+    return board.current_piece
+
+
+class MoveSearchTest(unittest.TestCase):
+    def check_boards(self, width, height, seed, count):
+        rng = random.Random(seed)
+        checked = 0
+        while checked < count:
+            board = random_stack(rng, width, height)
+            for shape_name, rotations in PIECE_TABLE.items():
+                # Départ à l'apparition ou n'importe où dans la grille
+                if rng.random() < 0.5:
+                    start = (0, width // 2 - 1, 0)
+                else:
+                    rotation = rng.randrange(len(rotations))
+                    data = rotations[rotation]
+                    start = (rotation, rng.randrange(data.min_x, width - data.width - data.x_shift + 1),
+                             rng.randrange(height - data.height - data.y_shift + 1))
+                if not board.is_valid_placement(rotations[start[0]], start[1], start[2]):
+                    continue
+                checked += 1
+
+                search = MoveSearch(board, shape_name, *start)
+                found = {}
+                for _, rotation_index, x, y in search.placements(start[0]):
+                    cells = frozenset(placement_blocks(rotations[rotation_index], x, y))
+                    found[cells] = (rotation_index, x, y)
+                with self.subTest(shape=shape_name, start=start):
+                    self.assertEqual(set(found), brute_force_locks(board, shape_name, start))
+
+                    for cells, state in found.items():
+                        piece = replay(board, shape_name, start, search.path(*state))
+                        self.assertIsNotNone(piece, state)
+                        self.assertEqual(frozenset(piece.get_blocks()), cells)
+                        # La pièce ne peut plus descendre : elle se verrouille là
+                        self.assertFalse(board.try_move(0, 1))
+
+    def test_default_board(self):
+        self.check_boards(10, 20, seed=1, count=400)
+
+    def test_other_sizes(self):
+        self.check_boards(7, 15, seed=2, count=150)
+        self.check_boards(16, 12, seed=3, count=100)
+
+
+if __name__ == '__main__':
+    unittest.main()
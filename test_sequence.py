@@ -0,0 +1,60 @@
+"""Tests de reproductibilité des suites de pièces
+
+Deux suites de même graine doivent donner les mêmes pièces, quel que soit le
+nombre de tirages des règles spéciales (choice) faits sur chacune.
+
+Lancement : python -m unittest -v
+"""
+
+import unittest
+
+from main import PieceSequence, NORMAL_PIECE_TYPES
+
+# Plusieurs blocs précalculés, pour traverser leurs frontières
+DRAWS = 3 * PieceSequence.CHUNK_SIZE + 10
+
+
+def first_difference(first, second):
+    """Rang du premier tirage différent entre deux suites, ou None"""
+    for index, (a, b) in enumerate(zip(first, second)):
+        if a != b:
+            return index
+    return None if len(first) == len(second) else min(len(first), len(second))
+
+
+class PieceSequenceTest(unittest.TestCase):
+    def check_randomizer(self, randomizer):
+        for seed in range(5):
+            first = PieceSequence(seed, randomizer)
+            second = PieceSequence(seed, randomizer)
+            first_shapes, second_shapes = [], []
+            for index in range(DRAWS):
+                # Tirages de règles à des rythmes différents sur les deux suites
+                if index % 7 == 0:
+                    first.choice(['HEART', 'STAR'])
+                if index % 3 == 0:
+                    second.choice(['I', 'O'])
+                first_shapes.append(first.next_shape())
+                second_shapes.append(second.next_shape())
+            with self.subTest(seed=seed):
+                self.assertIsNone(first_difference(first_shapes, second_shapes))
+
+    def test_uniform(self):
+        self.check_randomizer('uniform')
+
+    def test_bag(self):
+        self.check_randomizer('bag')
+
+    def test_same_sequence_as_without_rule_draws(self):
+        plain = PieceSequence(0)
+        expected = [plain.next_shape() for _ in range(DRAWS)]
+        sequence = PieceSequence(0)
+        shapes = []
+        for _ in range(DRAWS):
+            sequence.choice(NORMAL_PIECE_TYPES)
+            shapes.append(sequence.next_shape())
+        self.assertIsNone(first_difference(shapes, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests d'équité des matchs de tournoi
+
+Les deux IA d'un match doivent recevoir la même suite de pièces pendant toute
+la partie, même quand les règles spéciales (cadeau surprise, pièce rigolote)
+font des tirages différents sur chaque plateau.
+
+Lancement : python -m unittest -v
+"""
+
+import unittest
+from unittest import mock
+
+from main import PieceSequence, DEFAULT_WEIGHTS
+from tournament import Agent, play_round
+from test_sequence import first_difference
+
+
+class MatchSequenceTest(unittest.TestCase):
+    def test_same_sequence_for_both_boards(self):
+        draws = {}
+        next_shape = PieceSequence.next_shape
+
+        def recording_next_shape(sequence):
+            shape_name = next_shape(sequence)
+            draws.setdefault(id(sequence), []).append(shape_name)
+            return shape_name
+
+        # Poids différents : les deux IA jouent et reçoivent des cadeaux différemment
+        agents = (Agent('a', 2, None), Agent('b', 2, DEFAULT_WEIGHTS._replace(holes=-8)))
+        with mock.patch.object(PieceSequence, 'next_shape', recording_next_shape):
+            play_round([agents], seed=0, games=3, max_pieces=600, rules='classic')
+
+        # Les plateaux tirent leur première pièce dans l'ordre de création
+        sequences = list(draws.values())
+        self.assertEqual(len(sequences), 6)
+        # Au moins une partie dépasse un bloc précalculé de la suite
+        self.assertGreater(max(map(len, sequences)), PieceSequence.CHUNK_SIZE)
+        for first, second in zip(sequences[::2], sequences[1::2]):
+            length = min(len(first), len(second))
+            self.assertIsNone(first_difference(first[:length], second[:length]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+"""Tournoi entre plusieurs réglages de l'IA
+
+Chaque match oppose deux IA sur la même suite de pièces, avec les règles
+spéciales choisies (cadeau surprise, pause douceur, ou aucune) ; les pièces
+offertes ou spéciales remplacent une pièce de la suite sans la décaler. Toutes les
+parties d'une ronde sont jouées dans le même processus, sur une seule
+horloge simulée : des dizaines de plateaux avancent ensemble aussi vite que
+le processeur le permet. Les rondes suivent un toutes-rondes ou un système
+suisse, et le classement est affiché à la fin.
+"""
+import math
+import argparse
+from collections import namedtuple
+
+from headless import HeadlessGame
+from main import SimulatedClock, RULE_SETS, load_weights
+
+# Réglage d'une IA participante (weights = None pour les poids par défaut)
+Agent = namedtuple('Agent', ['name', 'depth', 'weights'])
+
+# Résultat d'une partie : scores des deux IA et points obtenus (1, 0.5 ou 0)
+MatchResult = namedtuple('MatchResult', ['first', 'second', 'first_score', 'second_score',
+                                         'first_points', 'second_points'])
+
+
+def parse_agent(spec):
+    """Lit un participant au format nom:profondeur[:poids.json]"""
+    name, depth, *weights = spec.split(':', 2)
+    return Agent(name, int(depth), load_weights(weights[0]) if weights else None)
+
+
+def round_robin(agents):
+    """Rondes d'un toutes-rondes (méthode du cercle), None marquant l'exempt"""
+    players = list(agents) + ([None] if len(agents) % 2 else [])
+    rounds = []
+    for _ in range(len(players) - 1):
+        half = len(players) // 2
+        rounds.append([(players[i], players[-1 - i]) for i in range(half)])
+        # Le premier reste fixe, les autres tournent d'un cran
+        players = [players[0], players[-1]] + players[1:-1]
+    return rounds
+
+
+def swiss_pairings(agents, standings, played):
+    """Appariements d'une ronde suisse
+
+    Les IA sont triées par points puis par score total ; chacune affronte la
+    suivante qu'elle n'a pas encore rencontrée. Si le nombre d'IA est impair,
+    la moins bien classée qui n'a pas encore été exempte l'est.
+    """
+    ranked = sorted(agents, key=lambda agent: (standings[agent.name]['points'],
+                                               standings[agent.name]['score']), reverse=True)
+    pairings = []
+    if len(ranked) % 2:
+        bye = next((agent for agent in reversed(ranked) if (agent.name, None) not in played),
+                   ranked[-1])
+        ranked.remove(bye)
+        pairings.append((bye, None))
+    while len(ranked) > 1:
+        first = ranked.pop(0)
+        opponent = next((other for other in ranked if (first.name, other.name) not in played),
+                        ranked[0])
+        ranked.remove(opponent)
+        pairings.append((first, opponent))
+    return pairings
+
+
+def _points(first, second):
+    """Points des deux plateaux d'une partie : le survivant gagne, sinon le meilleur score"""
+    if first['lost'] != second['lost']:
+        return (0, 1) if first['lost'] else (1, 0)
+    if first['score'] == second['score']:
+        return (0.5, 0.5)
+    return (1, 0) if first['score'] > second['score'] else (0, 1)
+
+
+def play_round(pairings, seed=0, games=1, max_pieces=None, rules='classic'):
+    """Joue toutes les parties d'une ronde sur une même horloge simulée
+
+    Chaque paire joue games parties, de graines seed, seed + 1, etc. Les deux
+    IA d'une partie reçoivent la même suite de pièces et échangent leurs
+    places d'une partie à l'autre. Renvoie la liste des MatchResult.
+    """
+    clock = SimulatedClock()
+    matches = []
+    for first, second in pairings:
+        if first is None or second is None:
+            continue
+        for game_index, game_seed in enumerate(range(seed, seed + games)):
+            seats = (first, second) if game_index % 2 == 0 else (second, first)
+            game = HeadlessGame(seed=game_seed, max_pieces=max_pieces, rules=RULE_SETS[rules](),
+                                clock=clock,
+                                players=[{'depth': agent.depth, 'weights': agent.weights}
+                                         for agent in seats])
+            matches.append((*seats, game))
+
+    # Boucle serrée : un seul échéancier pour tous les plateaux de la ronde
+    while not all(game.is_over() for _, _, game in matches) and clock.advance():
+        pass
+
+    results = []
+    for first, second, game in matches:
+        first_result, second_result = game.results()
+        first_points, second_points = _points(first_result, second_result)
+        results.append(MatchResult(first.name, second.name, first_result['score'],
+                                   second_result['score'], first_points, second_points))
+    return results
+
+
+def run_tournament(agents, system='round-robin', rounds=None, seed=0, games=1, max_pieces=None,
+                   rules='classic'):
+    """Joue le tournoi et renvoie le classement (dictionnaire par nom d'IA)
+
+    En système suisse, rounds vaut par défaut le logarithme en base 2 du
+    nombre d'IA, arrondi au-dessus.
+    """
+    standings = {agent.name: {'played': 0, 'wins': 0, 'draws': 0, 'losses': 0,
+                              'points': 0.0, 'score': 0}
+                 for agent in agents}
+    played = set()
+
+    if system == 'round-robin':
+        schedule = round_robin(agents)
+        total_rounds = len(schedule)
+    else:
+        schedule = None
+        total_rounds = rounds or max(1, math.ceil(math.log2(len(agents))))
+
+    for round_index in range(total_rounds):
+        if schedule is not None:
+            pairings = schedule[round_index]
+        else:
+            pairings = swiss_pairings(agents, standings, played)
+        for first, second in pairings:
+            if second is None:
+                played.add((first.name, None))
+
+        # Chaque ronde a ses propres graines
+        round_seed = seed + round_index * games
+        for result in play_round(pairings, round_seed, games, max_pieces, rules):
+            played.add((result.first, result.second))
+            played.add((result.second, result.first))
+            for name, score, points in ((result.first, result.first_score, result.first_points),
+                                        (result.second, result.second_score, result.second_points)):
+                entry = standings[name]
+                entry['played'] += 1
+                entry['points'] += points
+                entry['score'] += score
+                if points == 1:
+                    entry['wins'] += 1
+                elif points == 0:
+                    entry['losses'] += 1
+                else:
+                    entry['draws'] += 1
+
+    return standings
+
+
+def format_standings(standings):
+    """Met en forme le classement, du premier au dernier"""
+    ranked = sorted(standings.items(), key=lambda item: (item[1]['points'], item[1]['score']),
+                    reverse=True)
+    lines = [f"{'':4}{'IA':16}{'J':>5}{'G':>5}{'N':>5}{'P':>5}{'points':>8}{'score moyen':>13}"]
+    for rank, (name, entry) in enumerate(ranked, 1):
+        mean_score = entry['score'] / entry['played'] if entry['played'] else 0.0
+        lines.append(f"{rank:<4}{name:16}{entry['played']:>5}{entry['wins']:>5}{entry['draws']:>5}"
+                     f"{entry['losses']:>5}{entry['points']:>8.1f}{mean_score:>13.1f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tournoi entre réglages de l'IA")
+    parser.add_argument('--agent', action='append', dest='agents', metavar='NOM:PROFONDEUR[:POIDS]',
+                        help="participant (option répétable), par exemple base:1 ou regle:1:weights.json")
+    parser.add_argument('--system', choices=['round-robin', 'swiss'], default='round-robin',
+                        help="appariements : toutes-rondes ou système suisse")
+    parser.add_argument('--rounds', type=int, default=None, help="nombre de rondes en système suisse")
+    parser.add_argument('--games', type=int, default=4, help="parties par match")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--max-pieces', type=int, default=500,
+                        help="arrêter une partie après ce nombre de pièces")
+    parser.add_argument('--rules', choices=list(RULE_SETS), default='classic',
+                        help="règles spéciales entre plateaux")
+    args = parser.parse_args()
+
+    agents = [parse_agent(spec) for spec in (args.agents or ['base:1', 'anticipation:2'])]
+    if len({agent.name for agent in agents}) != len(agents):
+        parser.error("chaque participant doit avoir un nom différent")
+
+    standings = run_tournament(agents, system=args.system, rounds=args.rounds, seed=args.seed,
+                               games=args.games, max_pieces=args.max_pieces, rules=args.rules)
+    print(format_standings(standings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Réglage des poids d'évaluation de l'IA par la méthode de l'entropie croisée
+
+À chaque génération, une population de vecteurs de poids est tirée autour
+d'une distribution normale. Chaque vecteur est noté par le score moyen de
+parties sans interface jouées sur les mêmes graines (les notes restent ainsi
+comparables d'une génération à l'autre), et la distribution est recentrée sur
+les meilleurs. Les parties sont réparties sur un pool de processus.
+
+Après chaque génération, les meilleurs poids trouvés et l'état de la
+distribution sont enregistrés dans un fichier que main.py, headless.py et
+batch.py peuvent charger avec --weights. Le réglage s'arrête quand le
+meilleur score ne progresse plus pendant patience générations.
+"""
+import os
+import json
+import math
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from batch import play_game
+from main import EvaluationWeights, DEFAULT_WEIGHTS, save_weights
+
+# Écart type minimal de la distribution, pour continuer à explorer
+MIN_STD = 0.5
+
+
+def sample_population(rng, mean, std, size):
+    """Tire size vecteurs de poids autour de la distribution (mean, std)"""
+    return [EvaluationWeights(*(rng.gauss(m, s) for m, s in zip(mean, std)))
+            for _ in range(size)]
+
+
+def evaluate_population(executor, population, seeds, max_pieces, randomizer, depth):
+    """Score moyen de chaque vecteur de poids sur les parties des graines seeds
+
+    Une tâche par couple (poids, graine), envoyées par paquets d'un vecteur.
+    """
+    tasks = [(weights, seed) for weights in population for seed in seeds]
+    records = executor.map(
+        play_game,
+        [seed for _, seed in tasks],
+        [max_pieces] * len(tasks),
+        [randomizer] * len(tasks),
+        [depth] * len(tasks),
+        ['python'] * len(tasks),
+        [weights for weights, _ in tasks],
+        chunksize=len(seeds),
+    )
+    scores = [record.score for record in records]
+    return [sum(scores[i:i + len(seeds)]) / len(seeds) for i in range(0, len(scores), len(seeds))]
+
+
+def tune(checkpoint, generations=20, population=16, elite=4, games=8, seed=0, workers=None,
+         max_pieces=300, randomizer='uniform', depth=1, patience=5, resume=False):
+    """Règle les poids et renvoie les meilleurs trouvés avec leur score moyen
+
+    Avec resume, la distribution, les meilleurs poids, l'état du générateur
+    aléatoire et le nombre de générations sans progrès sont repris du fichier
+    checkpoint s'il existe : la reprise continue le réglage comme s'il n'avait
+    pas été interrompu.
+    """
+    rng = random.Random(seed)
+    seeds = list(range(seed, seed + games))
+
+    mean = list(DEFAULT_WEIGHTS)
+    std = [max(MIN_STD, abs(weight) / 2) for weight in DEFAULT_WEIGHTS]
+    best_weights, best_fitness = DEFAULT_WEIGHTS, -math.inf
+    start = 0
+    stale = 0
+    if resume and os.path.exists(checkpoint):
+        with open(checkpoint) as file:
+            state = json.load(file)
+        best_weights = EvaluationWeights(**state['weights'])
+        best_fitness = state['fitness']
+        mean, std, start = state['mean'], state['std'], state['generation'] + 1
+        stale = state.get('stale', 0)
+        if 'rng' in state:
+            # JSON ne connaît que les listes : getstate() renvoie des tuples
+            version, internal, gauss_next = state['rng']
+            rng.setstate((version, tuple(internal), gauss_next))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for generation in range(start, generations):
+            # Arrêt anticipé quand le record ne bouge plus (y compris si le
+            # réglage repris s'était déjà arrêté pour cette raison)
+            if stale >= patience:
+                break
+
+            # Les meilleurs poids connus sont toujours réévalués avec la population
+            candidates = [best_weights] + sample_population(rng, mean, std, population - 1)
+            fitness = evaluate_population(executor, candidates, seeds, max_pieces, randomizer, depth)
+
+            ranked = sorted(zip(fitness, candidates), key=lambda item: item[0], reverse=True)
+            elites = [weights for _, weights in ranked[:elite]]
+            mean = [sum(values) / len(values) for values in zip(*elites)]
+            std = [max(MIN_STD, math.sqrt(sum((value - m) ** 2 for value in values) / len(values)))
+                   for values, m in zip(zip(*elites), mean)]
+
+            if ranked[0][0] > best_fitness:
+                best_fitness, best_weights = ranked[0]
+                stale = 0
+            else:
+                stale += 1
+
+            save_weights(best_weights, checkpoint, fitness=best_fitness, generation=generation,
+                         mean=mean, std=std, stale=stale, rng=rng.getstate(), games=games,
+                         seed=seed, max_pieces=max_pieces)
+            print(f"Génération {generation} : meilleur {ranked[0][0]:.1f}, "
+                  f"population {sum(fitness) / len(fitness):.1f}, record {best_fitness:.1f}")
+
+    return best_weights, best_fitness
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Réglage des poids d'évaluation de l'IA")
+    parser.add_argument('--output', default='weights.json',
+                        help="fichier des meilleurs poids, réécrit à chaque génération")
+    parser.add_argument('--generations', type=int, default=20, help="nombre maximal de générations")
+    parser.add_argument('--population', type=int, default=16, help="vecteurs de poids par génération")
+    parser.add_argument('--elite', type=int, default=4, help="meilleurs vecteurs gardés")
+    parser.add_argument('--games', type=int, default=8, help="parties par vecteur de poids")
+    parser.add_argument('--seed', type=int, default=0, help="graine du tirage et des parties")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--max-pieces', type=int, default=300,
+                        help="arrêter une partie après ce nombre de pièces")
+    parser.add_argument('--randomizer', choices=['uniform', 'bag'], default='uniform',
+                        help="générateur de pièces")
+    parser.add_argument('--depth', type=int, default=1,
+                        help="pièces anticipées par l'IA (2 = pièce courante et suivante)")
+    parser.add_argument('--patience', type=int, default=5,
+                        help="générations sans progrès avant l'arrêt")
+    parser.add_argument('--resume', action='store_true', help="reprendre depuis le fichier --output")
+    args = parser.parse_args()
+
+    weights, fitness = tune(args.output, generations=args.generations, population=args.population,
+                            elite=args.elite, games=args.games, seed=args.seed, workers=args.workers,
+                            max_pieces=args.max_pieces, randomizer=args.randomizer, depth=args.depth,
+                            patience=args.patience, resume=args.resume)
+    print(f"Meilleurs poids ({fitness:.1f} points en moyenne) : {dict(weights._asdict())}")
+
+
+if __name__ == "__main__":
+    main()